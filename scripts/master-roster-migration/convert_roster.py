@@ -3,7 +3,10 @@
 Phase 2: Convert roster_with_ids.csv into Supabase import CSVs.
 
 Usage:
-    python scripts/convert_roster.py <roster_with_ids_file>
+    python scripts/convert_roster.py <roster_with_ids_file> [--no-cache]
+        [--mappings role_mappings.json] [--watch] [--compress gz|zst]
+        [--checkpoint-every ROWS] [--resume]
+        [--estimate [--sample-size N] [--seed S]]
 
 Example:
     python scripts/convert_roster.py roster_with_ids-women.csv
@@ -11,255 +14,136 @@ Example:
 
 Input:
     - roster_with_ids.csv (or specified file): Output from Phase 1 with user_id column
+      (may be .csv.gz or .csv.zst)
 
 Output:
     - users_update_<suffix>.csv: User profile updates
     - users_experience_<suffix>.csv: Service experience records
-    - unmatched_roles_<suffix>.txt: Roles that couldn't be mapped
+    - unmatched_roles_<suffix>.txt: Roles that couldn't be mapped, by impact,
+      with suggested role_mapping keys
     - conversion_stats_<suffix>.txt: Processing summary
+    - <roster_with_ids_file>.ir: Cached parse of the input, reused on reruns
+      until the input or rollista patterns change (disable with --no-cache)
+
+Role, skip, rollista and rollo tables are read from role_mappings.json (or
+--mappings). With --watch the script keeps running and re-maps only the rows
+affected whenever that file changes.
+
+For very large inputs, --checkpoint-every ROWS streams the conversion and
+periodically fsyncs the outputs and saves conversion_checkpoint_<suffix>.json;
+if interrupted, rerun with --resume to continue from the last checkpoint.
+
+--estimate converts a seeded random sample of rows and extrapolates output
+counts, unmatched-role rates, output sizes and runtime with confidence
+intervals, without writing anything.
 """
 
+import argparse
 import csv
+import hashlib
+import io
 import json
+import os
+import pickle
 import re
-import sys
+import sqlite3
+import tempfile
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+from roster_io import (
+    COMPRESSION_SUFFIXES,
+    PipelineWriter,
+    format_pipeline_stats,
+    open_binary,
+    open_text,
+    pipelined_reader,
+    strip_compression_suffix,
+    with_compression,
+)
+from roster_estimate import (
+    DEFAULT_SAMPLE_SIZE,
+    DEFAULT_SEED,
+    estimate_total,
+    format_estimate,
+    reservoir_sample,
+    scale_estimate,
+)
 
 
 # =============================================================================
-# ROLE MAPPING
+# MAPPING TABLES
 # =============================================================================
 
-ROLE_MAPPING = {
-    # Direct matches (case-insensitive)
-    "rector": "Rector",
-    "head": "Head",
-    "assistant head": "Assistant Head",
-    "backup rector": "Backup Rector",
-    "head tech": "Head Tech",
-    "tech": "Tech",
-    "head rollista": "Head Rollista",
-    "table leader": "Table Leader",
-    "head spiritual director": "Head Spiritual Director",
-    "spiritual director": "Spiritual Director",
-    "spiritual director trainee": "Spiritual Director Trainee",
-    "head prayer": "Head Prayer",
-    "prayer": "Prayer",
-    "head chapel": "Head Chapel",
-    "chapel": "Chapel",
-    "head chapel tech": "Head Chapel Tech",
-    "head music": "Head Music",
-    "music": "Music",
-    "head palanca": "Head Palanca",
-    "palanca": "Palanca",
-    "head table": "Head Table",
-    "table": "Table",
-    "head dorm": "Head Dorm",
-    "dorm": "Dorm",
-    "head dining": "Head Dining",
-    "dining": "Dining",
-    "head mobile": "Head Mobile",
-    "mobile": "Mobile",
-    "escort": "Escort",
-    "floater": "Floater",
-    "head floater": "Floater",
-    "meat": "Meat",
-    "roster": "Roster",
-    "gopher": "Gopher",
-    "medic": "Medic",
-    "smoker": "Smoker",
-    "rover": "Rover",
-
-    # Abbreviations and variations
-    "head cha": "Head",
-    "hd cha": "Head",
-    "hd. cha": "Head",
-    "asst head cha": "Assistant Head",
-    "asst hd cha": "Assistant Head",
-    "asst hd. cha": "Assistant Head",
-    "asst. head cha": "Assistant Head",
-    "asst. head": "Assistant Head",
-    "ass't. head": "Assistant Head",
-    "asst head": "Assistant Head",
-    "asst hd": "Assistant Head",
-    "bur": "Backup Rector",
-
-    # Spiritual Director variations
-    "sd": "Spiritual Director",
-    "spiritual dir.": "Spiritual Director",
-    "hd spiritual dir": "Head Spiritual Director",
-    "hd sd": "Head Spiritual Director",
-    "hd. sd": "Head Spiritual Director",
-    "head sd": "Head Spiritual Director",
-
-    # Kitchen/Dining variations
-    "hd kitchen": "Head Dining",
-    "head kitchen": "Head Dining",
-    "kitchen": "Dining",
-    "hd dining": "Head Dining",
-
-    # Tech variations
-    "hd tech": "Head Tech",
-    "hd. tech": "Head Tech",
-    "video tech": "Tech",
-    "sound": "Tech",
-
-    # Music variations
-    "hd music": "Head Music",
-    "hd. music": "Head Music",
-
-    # Prayer variations
-    "hd prayer": "Head Prayer",
-    "hd. prayer": "Head Prayer",
-
-    # Palanca variations
-    "hd palanca": "Head Palanca",
-    "hd. palanca": "Head Palanca",
-
-    # Dorm variations
-    "hd dorm": "Head Dorm",
-    "hd. dorm": "Head Dorm",
-
-    # Mobile variations
-    "hd mobile": "Head Mobile",
-    "hd. mobile": "Head Mobile",
-
-    # Rollista variations
-    "hd rollista": "Head Rollista",
-    "hd. rollista": "Head Rollista",
-
-    # Escort variations
-    "head escort": "Escort",
-
-    # Roster variations
-    "head roster": "Roster",
-
-    # Silent = Table Leader
-    "silent": "Table Leader",
-    "table leader (silent)": "Table Leader",
-
-    # Medical
-    "nurse": "Medic",
-    "meat cha": "Meat",
-
-    # Additional variations found in data
-    "asst. hd cha": "Assistant Head",
-    "audio": "Tech",
-    "chapel tech": "Head Chapel Tech",
-    "gofer": "Gopher",  # typo
-    "hd chapel": "Head Chapel",
-    "hd escort": "Escort",
-    "hd table": "Head Table",
-    "lead tech": "Head Tech",
-    "sd in training": "Spiritual Director Trainee",
-    "smoker cha": "Smoker",
-    "chapel cha": "Chapel",
-    "dining cha": "Dining",
-    "mentor cha (sd)": "Spiritual Director",
-    "mentor cha": "Spiritual Director",
-}
-
-# Roles to skip entirely
-SKIP_ROLES = {
-    "storeroom",
-    "head storeroom",
-    "outside coordinator",
-    "special events",
-    "spec events",
-    "events coord",
-    "fellowship",
-    "head fellowship",
-    "chapel music",  # Not a standard CHA role
-    "chapel sheperd",  # Typo, not a role
-    "chapel shepherd",
-    "reunion groups",  # Talk name, not a role
-    "se",  # Unclear abbreviation
-    "envir",  # Needs to be in rollista pattern to work
-}
-
-# Patterns for roles that should be skipped (regex)
-SKIP_PATTERNS = [
-    r"^asst\.?\s*h(?:ea)?d\.?\s+(?!cha\b)",  # asst head X where X is not "cha" (word boundary)
-]
+# Role, skip, rollista and rollo tables live in a data file so new variations
+# can be added without editing code. See docs/migrating-master-roster.md.
+DEFAULT_MAPPINGS_PATH = Path(__file__).parent / "role_mappings.json"
 
+# Schema version of the mappings file this script understands
+MAPPINGS_VERSION = 1
 
-# =============================================================================
-# ROLLISTA WITH EMBEDDED ROLLO PATTERNS
-# =============================================================================
 
-# (pattern to match, rollo name or None if rollo comes from Talk column)
-ROLLISTA_PATTERNS = [
-    ("study rollista", "Study"),
-    ("study rollo", "Study"),
-    ("rollista study", "Study"),
-    ("piety rollista", "Piety"),
-    ("piety rollo", "Piety"),
-    ("rollista piety", "Piety"),
-    ("leaders rollista", "Leaders"),
-    ("leaders rollo", "Leaders"),
-    ("rollista leaders", "Leaders"),
-    ("church rollista", "Church"),
-    ("church rollo", "Church"),
-    ("rollista church", "Church"),
-    ("rollista - church", "Church"),
-    ("action rollista", "Action"),
-    ("action rollo", "Action"),
-    ("rollista action", "Action"),
-    ("ccia rollista", "CCIA"),
-    ("ccia rollo", "CCIA"),
-    ("ideals rollista", "Ideals"),
-    ("ideals rollo", "Ideals"),
-    ("environ rollista", "Environments"),
-    ("environ rollo", "Environments"),
-    ("environ. rollo", "Environments"),
-    ("envir rollo", "Environments"),
-    ("environments rollo", "Environments"),
-    ("rollista environments", "Environments"),
-    ("reunion rollista", "Reunion Group"),
-    ("reunion rollo", "Reunion Group"),
-    ("reunion group rollo", "Reunion Group"),
-    ("reunion groups rollo", "Reunion Group"),
-    ("rollista reunion", "Reunion Group"),
-    ("obstacles rollo", "Obstalces to Grace"),
-    ("holy spirit rollo", "Holy Spirit"),
-    ("grace rollo", "Grace"),
-    ("fourth day rollo", "Fourth Day"),
-    ("life in grace rollo", "Life in Grace"),
-    ("sacred moments rollo", "Sacred Moments of Grace"),
-    # Plain rollista - must be last as it's a catch-all
-    ("rollista", None),
-]
+def compile_mappings(data: dict) -> dict:
+    """
+    Compile raw mapping tables into the lookup structures used by the converter.
 
+    Keys are lowercased once here so lookups never have to; skip patterns are
+    folded into a single regex; rollista patterns keep their order because the
+    first match wins (plain "rollista" must stay last as the catch-all).
+    """
+    version = data.get("version")
+    if version != MAPPINGS_VERSION:
+        raise ValueError(
+            f"Unsupported mappings version {version!r} (expected {MAPPINGS_VERSION})"
+        )
+
+    skip_patterns = list(data.get("skip_patterns", []))
+    rollista_patterns = tuple(
+        (pattern.lower().strip(), rollo)
+        for pattern, rollo in data.get("rollista_patterns", [])
+    )
+
+    return {
+        "role_mapping": {
+            legacy.lower().strip(): role
+            for legacy, role in data.get("role_mapping", {}).items()
+        },
+        "skip_roles": frozenset(
+            role.lower().strip() for role in data.get("skip_roles", [])
+        ),
+        "skip_patterns": skip_patterns,
+        "skip_re": re.compile("|".join(f"(?:{p})" for p in skip_patterns))
+        if skip_patterns else None,
+        "rollista_patterns": rollista_patterns,
+        "rollista_fingerprint": hashlib.sha1(
+            repr(rollista_patterns).encode("utf-8")
+        ).hexdigest(),
+        "fingerprint": hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode("utf-8")
+        ).hexdigest(),
+        "rollo_mapping": {
+            talk.lower().strip(): rollo
+            for talk, rollo in data.get("rollo_mapping", {}).items()
+        },
+    }
 
-# =============================================================================
-# ROLLO MAPPING
-# =============================================================================
 
-ROLLO_MAPPING = {
-    "ideals": "Ideals",
-    "grace": "Grace",
-    "church": "Church",
-    "holy spirit": "Holy Spirit",
-    "piety": "Piety",
-    "study": "Study",
-    "sacred moments of grace": "Sacred Moments of Grace",
-    "action": "Action",
-    "obstacles to grace": "Obstalces to Grace",  # Note: typo in system
-    "leaders": "Leaders",
-    "environments": "Environments",
-    "life in grace": "Life in Grace",
-    "ccia": "CCIA",
-    "reunion group": "Reunion Group",
-    "fourth day": "Fourth Day",
-    # Abbreviations
-    "obstacles": "Obstalces to Grace",
-    "reunion": "Reunion Group",
-    "environment": "Environments",
-    "environ": "Environments",
-    "envir": "Environments",
-    "sacred moments": "Sacred Moments of Grace",
-}
+def load_mappings(path: Path) -> dict:
+    """Load and compile the mapping tables from a JSON data file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_mappings(json.load(f))
+
+
+# Compiled tables used by the helper functions below; replaced by watch mode
+# or --mappings via use_mappings().
+MAPPINGS = load_mappings(DEFAULT_MAPPINGS_PATH)
+
+
+def use_mappings(mappings: dict) -> None:
+    """Make `mappings` the active compiled tables."""
+    global MAPPINGS
+    MAPPINGS = mappings
 
 
 # =============================================================================
@@ -275,55 +159,189 @@ def normalize_weekend_reference(ref: str) -> str:
     return ref
 
 
-def parse_weekend_list(weekend_str: str) -> list[str]:
+# Tokens of the "Weekend Served" grammar. A single alternation keeps the scan
+# to one left-to-right pass; anything not covered falls through to "junk".
+_WEEKEND_TOKEN_RE = re.compile(
+    r"(?P<num>\d+)"
+    r"|(?P<word>[A-Za-z]+)"
+    r"|(?P<hash>#)"
+    r"|(?P<dash>[-\u2013\u2014])"
+    r"|(?P<sep>[,;&])"
+    r"|(?P<ws>\s+)"
+    r"|(?P<junk>.)"
+)
+
+_WEEKEND_SEPARATOR_WORDS = {"and"}
+_WEEKEND_RANGE_WORDS = {"to", "thru", "through"}
+
+
+def scan_weekend_ranges(
+    weekend_str: str,
+    unparsed: Optional[list[str]] = None
+) -> list[tuple[str, int, int]]:
     """
-    Parse weekend served string into list of normalized references.
-    'DTTD #1, 2, 3' -> ['DTTD#1', 'DTTD#2', 'DTTD#3']
-    'DTTD #1, #2, #3' -> ['DTTD#1', 'DTTD#2', 'DTTD#3']
+    Scan a weekend served string into (community, first, last) ranges.
+    'DTTD #3-7' -> [('DTTD', 3, 7)]
+    '#12 & #14; KAIROS 3' -> [('DTTD', 12, 12), ('DTTD', 14, 14), ('KAIROS', 3, 3)]
+
+    Fragments (text between separators) that can't be fully understood are
+    appended to `unparsed` when a list is supplied. Such a fragment still
+    yields exactly one weekend, its first number under the community in effect
+    before it (or nothing if it has no number), so later positions stay lined
+    up with their weekends. It never changes the community carried forward.
     """
-    if not weekend_str or not weekend_str.strip():
-        return []
+    ranges = []
+    if not weekend_str:
+        return ranges
+
+    community = "DTTD"  # Default community, carried across fragments
+    prefix = None       # Community word not yet followed by a number
+    start = None        # Pending number waiting for a range end or separator
+    in_range = False    # Saw a dash/"to" after `start`
+    bad = False         # Fragment contains something we couldn't interpret
+    fragment_ranges = []
+    first = None        # First number in the fragment
+    fragment_community = community  # Community in effect when the fragment began
+    fragment_begin = 0
+
+    def end_fragment(end_pos: int) -> None:
+        nonlocal community, prefix, start, in_range, bad, first, fragment_community
+        if in_range or prefix is not None:
+            bad = True  # Dangling range like "#3-" or a word with no number
+        if start is not None and not in_range:
+            fragment_ranges.append((community, start, start))
+        if bad:
+            # Nothing in a fragment we couldn't read is trusted, including a
+            # community word it introduced
+            community = fragment_community
+            if first is not None:
+                ranges.append((community, first, first))
+            if unparsed is not None:
+                fragment = weekend_str[fragment_begin:end_pos].strip()
+                if fragment:
+                    unparsed.append(fragment)
+        else:
+            ranges.extend(fragment_ranges)
+        fragment_ranges.clear()
+        prefix = None
+        start = None
+        in_range = False
+        bad = False
+        first = None
+        fragment_community = community
+
+    for token in _WEEKEND_TOKEN_RE.finditer(weekend_str):
+        kind = token.lastgroup
+        text = token.group()
+
+        if kind == "word":
+            word = text.lower()
+            if word in _WEEKEND_SEPARATOR_WORDS:
+                kind = "sep"
+            elif word in _WEEKEND_RANGE_WORDS:
+                kind = "dash"
+
+        if kind == "ws" or kind == "hash":
+            continue
 
-    weekends = []
-    current_community = "DTTD"  # Default community
+        if kind == "num":
+            number = int(text)
+            if prefix is not None:
+                if in_range and prefix != community:
+                    bad = True  # 'DTTD #3 - KAIROS #7' isn't a range
+                    start = None
+                    in_range = False
+                community = prefix
+                prefix = None
+            if first is None:
+                first = number
+            if in_range:
+                if number >= start:
+                    fragment_ranges.append((community, start, number))
+                else:
+                    bad = True  # Descending range, leave it for a human
+                start = None
+                in_range = False
+            else:
+                if start is not None:
+                    fragment_ranges.append((community, start, start))
+                start = number
+        elif kind == "word":
+            if start is not None and not in_range:
+                fragment_ranges.append((community, start, start))
+                start = None
+            if prefix is not None:
+                bad = True  # Two words in a row, e.g. 'Rio Grande #3'
+            prefix = text.upper()
+        elif kind == "dash":
+            if start is None or in_range or prefix is not None:
+                bad = True
+            else:
+                in_range = True
+        elif kind == "sep":
+            end_fragment(token.start())
+            fragment_begin = token.end()
+        else:
+            bad = True
 
-    parts = [p.strip() for p in weekend_str.split(",")]
+    end_fragment(len(weekend_str))
+    return ranges
 
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
 
-        # Check if this part has a community prefix
-        match = re.match(r"([A-Z]+)\s*#?\s*(\d+)", part, re.IGNORECASE)
-        if match:
-            current_community = match.group(1).upper()
-            number = match.group(2)
-            weekends.append(f"{current_community}#{number}")
-        elif re.match(r"#?\s*(\d+)", part):
-            # Just a number, use current community
-            match = re.search(r"(\d+)", part)
-            if match:
-                number = match.group(1)
-                weekends.append(f"{current_community}#{number}")
+def iter_weekend_list(
+    weekend_str: str,
+    unparsed: Optional[list[str]] = None
+) -> Iterator[str]:
+    """Yield normalized weekend references, expanding ranges as they are consumed."""
+    for community, first, last in scan_weekend_ranges(weekend_str, unparsed):
+        for number in range(first, last + 1):
+            yield f"{community}#{number}"
 
-    return weekends
+
+def weekend_at(ranges: list[tuple[str, int, int]], index: int) -> Optional[str]:
+    """
+    The weekend at `index` of the expanded list, without expanding it. Past
+    the end this is the last weekend; with no weekends at all, None.
+    """
+    if not ranges:
+        return None
+    for community, first, last in ranges:
+        width = last - first + 1
+        if index < width:
+            return f"{community}#{first + index}"
+        index -= width
+    community, _, last = ranges[-1]
+    return f"{community}#{last}"
+
+
+def parse_weekend_list(
+    weekend_str: str,
+    unparsed: Optional[list[str]] = None
+) -> list[str]:
+    """
+    Parse weekend served string into list of normalized references.
+    'DTTD #1, 2, 3' -> ['DTTD#1', 'DTTD#2', 'DTTD#3']
+    'DTTD #1, #2, #3' -> ['DTTD#1', 'DTTD#2', 'DTTD#3']
+    'DTTD #3-5' -> ['DTTD#3', 'DTTD#4', 'DTTD#5']
+    '#12 & #14; KAIROS 3' -> ['DTTD#12', 'DTTD#14', 'KAIROS#3']
+    """
+    if not weekend_str or not weekend_str.strip():
+        return []
+    return list(iter_weekend_list(weekend_str, unparsed))
 
 
-def should_skip_role(role: str) -> bool:
-    """Check if a role should be skipped."""
+def should_skip_role(role: str, mappings: Optional[dict] = None) -> bool:
+    """Check if a role should be skipped (against the active tables by default)."""
+    mappings = mappings or MAPPINGS
     role_lower = role.lower().strip()
 
     # Check exact matches
-    if role_lower in SKIP_ROLES:
+    if role_lower in mappings["skip_roles"]:
         return True
 
     # Check patterns
-    for pattern in SKIP_PATTERNS:
-        if re.match(pattern, role_lower):
-            return True
-
-    return False
+    skip_re = mappings["skip_re"]
+    return bool(skip_re and skip_re.match(role_lower))
 
 
 def split_slash_roles(role: str) -> list[str]:
@@ -336,6 +354,10 @@ def split_slash_roles(role: str) -> list[str]:
     return [p for p in parts if p]
 
 
+_ROLE_COMMUNITY_WEEKEND_RE = re.compile(r"(.+?)\s+([A-Z]+)\s*#\s*(\d+)$", re.IGNORECASE)
+_ROLE_WEEKEND_RE = re.compile(r"(.+?)\s+#\s*(\d+)$")
+
+
 def extract_role_with_weekend(role: str) -> tuple[str, Optional[str]]:
     """
     Extract weekend reference embedded in role name.
@@ -344,7 +366,7 @@ def extract_role_with_weekend(role: str) -> tuple[str, Optional[str]]:
     'Prayer' -> ('Prayer', None)
     """
     # Pattern: Role Community #Number
-    match = re.match(r"(.+?)\s+([A-Z]+)\s*#\s*(\d+)$", role, re.IGNORECASE)
+    match = _ROLE_COMMUNITY_WEEKEND_RE.match(role)
     if match:
         base_role = match.group(1).strip()
         community = match.group(2).upper()
@@ -352,7 +374,7 @@ def extract_role_with_weekend(role: str) -> tuple[str, Optional[str]]:
         return (base_role, f"{community}#{number}")
 
     # Pattern: Role #Number (assume DTTD)
-    match = re.match(r"(.+?)\s+#\s*(\d+)$", role)
+    match = _ROLE_WEEKEND_RE.match(role)
     if match:
         base_role = match.group(1).strip()
         number = match.group(2)
@@ -368,7 +390,7 @@ def check_rollista_pattern(role: str) -> tuple[Optional[str], Optional[str]]:
     """
     role_lower = role.lower().strip()
 
-    for pattern, rollo in ROLLISTA_PATTERNS:
+    for pattern, rollo in MAPPINGS["rollista_patterns"]:
         if pattern in role_lower:
             return ("Table Leader", rollo)
 
@@ -380,20 +402,14 @@ def map_role(role: str) -> Optional[str]:
     role_lower = role.lower().strip()
 
     # Direct lookup
-    if role_lower in ROLE_MAPPING:
-        return ROLE_MAPPING[role_lower]
-
-    return None
+    return MAPPINGS["role_mapping"].get(role_lower)
 
 
 def map_rollo(talk: str) -> Optional[str]:
     """Map a talk string to the standard Rollo name."""
     talk_lower = talk.lower().strip()
 
-    if talk_lower in ROLLO_MAPPING:
-        return ROLLO_MAPPING[talk_lower]
-
-    return None
+    return MAPPINGS["rollo_mapping"].get(talk_lower)
 
 
 def parse_comma_list(value: str) -> list[str]:
@@ -423,231 +439,621 @@ def create_address_json(row: dict) -> str:
 
 
 # =============================================================================
-# MAIN PROCESSING
+# PARSE STAGE
+# =============================================================================
+
+# Bump whenever the shape of the intermediate representation (or the parsing
+# that produces it) changes, so stale sidecar caches are ignored.
+IR_VERSION = 3
+
+
+def parse_position_tokens(positions_str: str) -> list[tuple]:
+    """
+    Parse a positions column into role tokens, one per slash-separated sub role.
+
+    Each token is a tuple of:
+        (position_index, base_role, embedded_weekend, is_rollista, embedded_rollo)
+    'Tech/Roster, Rector #8' ->
+        [(0, 'Tech', None, False, None), (0, 'Roster', None, False, None),
+         (1, 'Rector', 'DTTD#8', False, None)]
+    """
+    tokens = []
+    for i, position in enumerate(parse_comma_list(positions_str)):
+        for sub_role in split_slash_roles(position):
+            base_role, embedded_weekend = extract_role_with_weekend(sub_role)
+            rollista_role, embedded_rollo = check_rollista_pattern(base_role)
+            tokens.append((
+                i,
+                base_role,
+                embedded_weekend,
+                rollista_role is not None,
+                embedded_rollo,
+            ))
+    return tokens
+
+
+def parse_row(row: dict, unparsed_weekends: list[str]) -> tuple:
+    """
+    Parse one roster row into its intermediate representation:
+        (user_id, profile, dttd_tokens, weekends, talks, other_tokens, other_talks)
+    where profile is (phone_number, church_affiliation, weekend_attended, address)
+    and weekends holds (community, first, last) ranges, expanded on lookup.
+    """
+    user_id = row.get("user_id", "").strip()
+    profile = (
+        row.get("Phone Number", row.get("Phone", "")).strip(),
+        row.get("Church Affiliation", "").strip(),
+        normalize_weekend_reference(row.get("Weekend Attended", "")),
+        create_address_json(row),
+    )
+    return (
+        user_id,
+        profile,
+        parse_position_tokens(row.get("Position @ DTTD", "")),
+        scan_weekend_ranges(row.get("Weekend Served", ""), unparsed_weekends),
+        parse_comma_list(row.get("Talk @ DTTD", "")),
+        parse_position_tokens(row.get("Other Experience", "")),
+        parse_comma_list(row.get("Other Talks", "")),
+    )
+
+
+def parse_roster(input_path: Path, read_stats: Optional[dict] = None) -> dict:
+    """
+    Parse the roster CSV into a compact intermediate representation. CSV
+    rows are read on a background thread; `read_stats` receives its queue
+    depth and stall times.
+
+    Returns:
+        Dict with keys: rows (list of parse_row tuples for rows with a user_id),
+        total_rows, rows_without_user_id, unparsed_weekends
+    """
+    parsed = {
+        "rows": [],
+        "total_rows": 0,
+        "rows_without_user_id": 0,
+        "unparsed_weekends": [],
+    }
+
+    with open_text(input_path, "r") as f:
+        reader = csv.DictReader(f)
+
+        for row in pipelined_reader(reader, read_stats if read_stats is not None else {}):
+            parsed["total_rows"] += 1
+
+            if not row.get("user_id", "").strip():
+                parsed["rows_without_user_id"] += 1
+                continue
+
+            parsed["rows"].append(parse_row(row, parsed["unparsed_weekends"]))
+
+    return parsed
+
+
+def ir_cache_path(input_path: Path) -> Path:
+    """Sidecar file holding the parsed representation of `input_path`."""
+    return input_path.with_name(input_path.name + ".ir")
+
+
+def ir_cache_key(input_path: Path) -> tuple:
+    """
+    Identify everything the parse stage depends on: the input file itself and
+    the rollista patterns (rollista detection happens while parsing).
+    """
+    stat = input_path.stat()
+    return (
+        IR_VERSION,
+        stat.st_size,
+        stat.st_mtime_ns,
+        MAPPINGS["rollista_fingerprint"],
+    )
+
+
+def load_parsed_roster(
+    input_path: Path,
+    use_cache: bool = True,
+    read_stats: Optional[dict] = None
+) -> dict:
+    """
+    Return the parsed roster, reusing the sidecar cache when it is still valid.
+    """
+    cache_path = ir_cache_path(input_path)
+    key = ir_cache_key(input_path)
+
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("key") == key:
+                print(f"  Using parsed cache: {cache_path}")
+                return cached["roster"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass  # Unreadable cache, fall through and re-parse
+
+    parsed = parse_roster(input_path, read_stats)
+
+    if use_cache:
+        with open(cache_path, "wb") as f:
+            pickle.dump({"key": key, "roster": parsed}, f, pickle.HIGHEST_PROTOCOL)
+
+    return parsed
+
+
+# =============================================================================
+# MAPPING STAGE
 # =============================================================================
 
 def process_experience_roles(
-    positions: list[str],
-    weekends: list[str],
+    tokens: list[tuple],
+    weekends: list[tuple[str, int, int]],
     talks: list[str],
     is_other: bool = False
-) -> list[dict]:
+) -> tuple[list[dict], list[str]]:
     """
-    Process a list of positions and weekends into experience records.
+    Map parsed position tokens and weekends into experience records.
 
     Args:
-        positions: List of position strings
-        weekends: List of weekend reference strings
+        tokens: Position tokens from parse_position_tokens
+        weekends: Weekend ranges from scan_weekend_ranges
         talks: List of talk names (for matching with Rollista positions)
         is_other: If True, use "Other" as base weekend reference
 
     Returns:
-        List of experience record dicts with keys: cha_role, rollo, weekend_reference
+        (records, unmatched) where records are dicts with keys cha_role, rollo,
+        weekend_reference and unmatched lists base roles that couldn't be mapped
     """
     records = []
+    unmatched = []
     talk_index = 0  # For matching talks to plain Rollista positions
 
-    for i, position in enumerate(positions):
-        # Split slash roles
-        sub_roles = split_slash_roles(position)
+    for i, base_role, embedded_weekend, is_rollista, embedded_rollo in tokens:
+        # Skip if should be skipped
+        if should_skip_role(base_role):
+            continue
 
-        for sub_role in sub_roles:
-            # Skip if should be skipped
-            if should_skip_role(sub_role):
-                continue
+        if is_rollista:
+            # It's a rollista pattern
+            cha_role = "Table Leader"
+            if embedded_rollo:
+                rollo = embedded_rollo
+            elif talk_index < len(talks):
+                # Get rollo from talks list
+                rollo = map_rollo(talks[talk_index])
+                talk_index += 1
+            else:
+                rollo = None
+        else:
+            # Regular role mapping
+            cha_role = map_role(base_role)
+            rollo = None
 
-            # Extract embedded weekend reference
-            base_role, embedded_weekend = extract_role_with_weekend(sub_role)
+        if not cha_role:
+            unmatched.append(base_role)
+            continue
 
-            # Check if it's a rollista pattern with embedded rollo
-            rollista_role, embedded_rollo = check_rollista_pattern(base_role)
+        # Determine weekend reference
+        if embedded_weekend:
+            weekend_ref = embedded_weekend
+        elif is_other:
+            weekend_ref = "Other"
+        else:
+            # Past the last weekend this reuses it; no weekends at all means "Other"
+            weekend_ref = weekend_at(weekends, i) or "Other"
 
-            if rollista_role:
-                # It's a rollista pattern
-                cha_role = rollista_role
-                if embedded_rollo:
-                    rollo = embedded_rollo
-                elif talk_index < len(talks):
-                    # Get rollo from talks list
-                    rollo = map_rollo(talks[talk_index])
-                    talk_index += 1
-                else:
-                    rollo = None
-            else:
-                # Regular role mapping
-                cha_role = map_role(base_role)
-                rollo = None
+        records.append({
+            "cha_role": cha_role,
+            "rollo": rollo,
+            "weekend_reference": weekend_ref,
+        })
 
-            if not cha_role:
-                # Couldn't map role - will be logged as unmatched
-                continue
+    return records, unmatched
 
-            # Determine weekend reference
-            if embedded_weekend:
-                weekend_ref = embedded_weekend
-            elif is_other:
-                weekend_ref = "Other"
-            elif i < len(weekends):
-                weekend_ref = weekends[i]
-            elif weekends:
-                # Use last weekend if we have more positions than weekends
-                weekend_ref = weekends[-1]
-            else:
-                weekend_ref = "Other"
 
-            records.append({
-                "cha_role": cha_role,
-                "rollo": rollo,
-                "weekend_reference": weekend_ref,
-            })
+def map_row(row: tuple) -> dict:
+    """
+    Run the mapping stage for one parsed row.
 
-    return records
+    Returns:
+        Dict with keys: user (users_update row or None), dttd and other
+        (experience rows), unmatched (list of (base_role, is_other) pairs)
+    """
+    user_id, profile, tokens, weekends, talks, other_tokens, other_talks = row
+
+    # --- Process Users Update ---
+    phone, church, weekend_attended, address_json = profile
+    user = None
+
+    # Only add if we have data to update
+    if address_json or phone or church or weekend_attended:
+        user = {
+            "id": user_id,
+            "phone_number": phone,
+            "church_affiliation": church,
+            "weekend_attended": weekend_attended,
+            "address": address_json,
+        }
+
+    # --- Process DTTD Experience ---
+    exp_records, unmatched = process_experience_roles(
+        tokens, weekends, talks, is_other=False
+    )
+
+    # --- Process Other Experience ---
+    other_records, other_unmatched = process_experience_roles(
+        other_tokens, [], other_talks, is_other=True
+    )
+
+    return {
+        "user_id": user_id,
+        "user": user,
+        "dttd": [{"user_id": user_id, **rec} for rec in exp_records],
+        "other": [{"user_id": user_id, **rec} for rec in other_records],
+        "unmatched": [(role, False) for role in unmatched]
+        + [(role, True) for role in other_unmatched],
+    }
 
 
-def process_roster(input_path: Path, output_suffix: str):
-    """Process the roster CSV and generate output files."""
+# =============================================================================
+# EXPERIENCE DEDUPE
+# =============================================================================
 
-    output_dir = input_path.parent
-    users_output = output_dir / f"users_update_{output_suffix}.csv"
-    experience_output = output_dir / f"users_experience_{output_suffix}.csv"
-    unmatched_output = output_dir / f"unmatched_roles_{output_suffix}.txt"
-    stats_output = output_dir / f"conversion_stats_{output_suffix}.txt"
+# Distinct experience keys held in memory before the unordered dedupe spills
+# to an on-disk set
+DEDUPE_MEMORY_KEYS = 200_000
 
-    # Tracking
-    users_rows = []
-    experience_rows = []
-    unmatched_roles = set()
-    stats = {
-        "total_rows": 0,
-        "rows_with_user_id": 0,
-        "rows_without_user_id": 0,
-        "users_with_updates": 0,
-        "experience_records": 0,
-        "dttd_experience": 0,
-        "other_experience": 0,
-    }
 
-    print(f"Processing {input_path}...")
+def iter_experience(results: Iterable[dict]) -> Iterator[tuple[dict, bool]]:
+    """Yield (experience_row, is_other) pairs, DTTD records first for each row."""
+    for result in results:
+        for rec in result["dttd"]:
+            yield rec, False
+        for rec in result["other"]:
+            yield rec, True
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
 
-        for row in reader:
-            stats["total_rows"] += 1
+def experience_key(rec: dict) -> tuple:
+    """Identity of an experience record: (user_id, cha_role, rollo, weekend_reference)."""
+    return (rec["user_id"], rec["cha_role"], rec["rollo"], rec["weekend_reference"])
 
-            user_id = row.get("user_id", "").strip()
-            if not user_id:
-                stats["rows_without_user_id"] += 1
-                continue
 
-            stats["rows_with_user_id"] += 1
+def experience_digest(rec: dict) -> bytes:
+    """16-byte digest of experience_key, used wherever dedupe keys are stored."""
+    return hashlib.blake2b(repr(experience_key(rec)).encode("utf-8"), digest_size=16).digest()
 
-            # --- Process Users Update ---
-            address_json = create_address_json(row)
-            phone = row.get("Phone Number", row.get("Phone", "")).strip()
-            church = row.get("Church Affiliation", "").strip()
-            weekend_attended = normalize_weekend_reference(
-                row.get("Weekend Attended", "")
-            )
 
-            # Only add if we have data to update
-            if address_json or phone or church or weekend_attended:
-                users_rows.append({
-                    "id": user_id,
-                    "phone_number": phone,
-                    "church_affiliation": church,
-                    "weekend_attended": weekend_attended,
-                    "address": address_json,
-                })
-                stats["users_with_updates"] += 1
+def users_are_grouped(rows: list[tuple]) -> bool:
+    """True if every user's rows are contiguous, so per-user dedupe is safe."""
+    finished = set()
+    current = None
+    for row in rows:
+        user_id = row[0]
+        if user_id != current:
+            if user_id in finished:
+                return False
+            if current is not None:
+                finished.add(current)
+            current = user_id
+    return True
+
 
-            # --- Process DTTD Experience ---
-            positions_str = row.get("Position @ DTTD", "")
-            weekends_str = row.get("Weekend Served", "")
-            talks_str = row.get("Talk @ DTTD", "")
+def dedupe_grouped_experience(
+    records: Iterator[tuple[dict, bool]],
+    stats: dict
+) -> Iterator[tuple[dict, bool]]:
+    """
+    Drop duplicate experience records from a stream grouped by user_id.
+    Only the current user's keys are kept; the set is flushed when the user changes.
+    """
+    current_user = None
+    seen = set()
 
-            positions = parse_comma_list(positions_str)
-            weekends = parse_weekend_list(weekends_str)
-            talks = parse_comma_list(talks_str)
+    for rec, is_other in records:
+        if rec["user_id"] != current_user:
+            current_user = rec["user_id"]
+            seen = set()
 
-            # Track unmatched roles
-            for pos in positions:
-                for sub_role in split_slash_roles(pos):
-                    if should_skip_role(sub_role):
+        key = experience_key(rec)
+        if key in seen:
+            stats["duplicate_experience"] += 1
+            continue
+        seen.add(key)
+        yield rec, is_other
+
+
+def dedupe_spilled_experience(
+    records: Iterator[tuple[dict, bool]],
+    stats: dict,
+    memory_keys: int = DEDUPE_MEMORY_KEYS
+) -> Iterator[tuple[dict, bool]]:
+    """
+    Drop duplicate experience records from a stream in any order.
+
+    Keys are hashed to 16-byte digests and kept in memory until `memory_keys`
+    is reached, then moved to a temporary SQLite set so memory stays bounded.
+    """
+    seen = set()
+    spill = None
+
+    with tempfile.TemporaryDirectory(prefix="experience-dedupe-") as tmp_dir:
+        try:
+            for rec, is_other in records:
+                digest = experience_digest(rec)
+
+                if spill is None:
+                    if digest in seen:
+                        stats["duplicate_experience"] += 1
                         continue
-                    base_role, _ = extract_role_with_weekend(sub_role)
-                    rollista_role, _ = check_rollista_pattern(base_role)
-                    if not rollista_role and not map_role(base_role):
-                        unmatched_roles.add(base_role)
-
-            exp_records = process_experience_roles(positions, weekends, talks, is_other=False)
-            for rec in exp_records:
-                experience_rows.append({
-                    "user_id": user_id,
-                    **rec
-                })
-                stats["experience_records"] += 1
-                stats["dttd_experience"] += 1
-
-            # --- Process Other Experience ---
-            other_positions_str = row.get("Other Experience", "")
-            other_talks_str = row.get("Other Talks", "")
-
-            other_positions = parse_comma_list(other_positions_str)
-            other_talks = parse_comma_list(other_talks_str)
-
-            # Track unmatched roles from Other Experience
-            for pos in other_positions:
-                for sub_role in split_slash_roles(pos):
-                    if should_skip_role(sub_role):
+                    seen.add(digest)
+                    if len(seen) >= memory_keys:
+                        spill = sqlite3.connect(Path(tmp_dir) / "seen.db")
+                        spill.execute("CREATE TABLE seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+                        spill.executemany("INSERT INTO seen VALUES (?)", ((k,) for k in seen))
+                        seen = set()
+                else:
+                    cursor = spill.execute("INSERT OR IGNORE INTO seen VALUES (?)", (digest,))
+                    if cursor.rowcount == 0:
+                        stats["duplicate_experience"] += 1
                         continue
-                    base_role, _ = extract_role_with_weekend(sub_role)
-                    rollista_role, _ = check_rollista_pattern(base_role)
-                    if not rollista_role and not map_role(base_role):
-                        unmatched_roles.add(f"[Other] {base_role}")
 
-            other_records = process_experience_roles(
-                other_positions, [], other_talks, is_other=True
-            )
-            for rec in other_records:
-                experience_rows.append({
-                    "user_id": user_id,
-                    **rec
-                })
-                stats["experience_records"] += 1
-                stats["other_experience"] += 1
-
-    # --- Write Output Files ---
-
-    # Users update CSV
-    if users_rows:
-        with open(users_output, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "id", "phone_number", "church_affiliation",
-                "weekend_attended", "address"
-            ])
-            writer.writeheader()
-            writer.writerows(users_rows)
-        print(f"  Users update: {users_output}")
-
-    # Experience CSV
-    if experience_rows:
-        with open(experience_output, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "user_id", "cha_role", "rollo", "weekend_reference"
-            ])
-            writer.writeheader()
-            writer.writerows(experience_rows)
-        print(f"  Experience: {experience_output}")
+                yield rec, is_other
+        finally:
+            if spill is not None:
+                spill.close()
+
+
+# =============================================================================
+# UNMATCHED ROLE REPORT
+# =============================================================================
+
+# Character n-gram size and cutoffs for suggesting ROLE_MAPPING keys
+NGRAM_SIZE = 3
+SUGGESTION_LIMIT = 3
+SUGGESTION_MIN_SCORE = 0.3
+
+
+def record_unmatched_roles(index: dict, user_id: str, unmatched: list[tuple]) -> None:
+    """
+    Count unmatched roles into `index`, keyed by the lowercased base role
+    (the same key a new role_mapping entry would need).
+
+    Each entry holds: role (first spelling seen), count, other_count, users.
+    """
+    for role, is_other in unmatched:
+        key = role.lower().strip()
+        entry = index.get(key)
+        if entry is None:
+            entry = index[key] = {"role": role, "count": 0, "other_count": 0, "users": set()}
+        entry["count"] += 1
+        if is_other:
+            entry["other_count"] += 1
+        entry["users"].add(user_id)
+
+
+def role_ngrams(role: str) -> set[str]:
+    """Character n-grams of a role, padded so short words still produce some."""
+    padded = f"  {role.lower().strip()} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def build_ngram_index(keys) -> tuple[dict, dict]:
+    """
+    Precompute n-grams for each mapping key plus an inverted index from
+    n-gram to the keys containing it.
+    """
+    key_ngrams = {key: role_ngrams(key) for key in keys}
+    inverted = {}
+    for key, grams in key_ngrams.items():
+        for gram in grams:
+            inverted.setdefault(gram, []).append(key)
+    return key_ngrams, inverted
+
+
+def suggest_roles(role: str, ngram_index: tuple[dict, dict]) -> list[tuple[str, float]]:
+    """
+    Suggest the closest role_mapping keys for an unmatched role by Dice
+    similarity of their n-gram sets. Only keys sharing at least one n-gram
+    are scored, via the inverted index.
+    """
+    key_ngrams, inverted = ngram_index
+    grams = role_ngrams(role)
+
+    shared = {}
+    for gram in grams:
+        for key in inverted.get(gram, ()):
+            shared[key] = shared.get(key, 0) + 1
+
+    scored = [
+        (key, 2 * common / (len(grams) + len(key_ngrams[key])))
+        for key, common in shared.items()
+    ]
+    scored = [(key, score) for key, score in scored if score >= SUGGESTION_MIN_SCORE]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:SUGGESTION_LIMIT]
+
+
+def write_unmatched_report(
+    path: Path,
+    unmatched_roles: dict,
+    writer_stats: Optional[dict] = None
+) -> None:
+    """
+    Write unmatched roles sorted by impact (occurrences, then affected users)
+    with suggested role_mapping keys for each. Lines are written by a writer
+    thread while suggestions are computed.
+    """
+    role_mapping = MAPPINGS["role_mapping"]
+    ngram_index = build_ngram_index(role_mapping)
+
+    entries = sorted(
+        unmatched_roles.items(),
+        key=lambda item: (-item[1]["count"], -len(item[1]["users"]), item[0]),
+    )
+
+    with open(path, "w", encoding="utf-8") as f, \
+            PipelineWriter(f.writelines, writer_stats if writer_stats is not None else {}) as out:
+        out.write("Roles that couldn't be mapped (most records recovered first):\n")
+        out.write("=" * 50 + "\n\n")
+        out.write(f"{'Count':>7} {'Users':>6}  Role\n")
+        for key, entry in entries:
+            other = f"  [Other: {entry['other_count']}]" if entry["other_count"] else ""
+            out.write(f"{entry['count']:>7} {len(entry['users']):>6}  {entry['role']}{other}\n")
+            for suggestion, score in suggest_roles(key, ngram_index):
+                out.write(
+                    f"{'':>16}? \"{suggestion}\" -> {role_mapping[suggestion]} ({score:.2f})\n"
+                )
+
+
+USERS_FIELDS = ["id", "phone_number", "church_affiliation", "weekend_attended", "address"]
+EXPERIENCE_FIELDS = ["user_id", "cha_role", "rollo", "weekend_reference"]
+
+
+def csv_batch_writer(path: Path, fieldnames: list[str]) -> tuple[dict, callable]:
+    """
+    Return (state, write_batch) for a PipelineWriter. The file is only created
+    once the first batch arrives, so outputs with no rows are never written;
+    the caller closes state["file"] afterwards.
+    """
+    state = {"file": None, "writer": None}
+
+    def write_batch(rows: list[dict]):
+        if state["file"] is None:
+            state["file"] = open_text(path, "w", newline="")
+            state["writer"] = csv.DictWriter(state["file"], fieldnames=fieldnames)
+            state["writer"].writeheader()
+        state["writer"].writerows(rows)
+
+    return state, write_batch
+
+
+def write_outputs(
+    input_path: Path,
+    output_suffix: str,
+    parsed: dict,
+    results: Iterable[dict],
+    compress: Optional[str] = None,
+    pipeline: Optional[dict] = None
+) -> list[dict]:
+    """
+    Aggregate mapped rows and write all output files. `compress` ('gz' or
+    'zst') compresses the users and experience CSVs.
+
+    `results` may be a lazy iterator: each row is mapped as the writers need
+    it, so mapping overlaps the writes. Each output is written by its own
+    writer thread; their queue depth and stall times are added to `pipeline`
+    (stage name -> stats) for the stats file.
+
+    Returns:
+        The mapped results, in row order
+    """
+    pipeline = pipeline if pipeline is not None else {}
+
+    output_dir = input_path.parent
+    users_output = with_compression(output_dir / f"users_update_{output_suffix}.csv", compress)
+    experience_output = with_compression(
+        output_dir / f"users_experience_{output_suffix}.csv", compress
+    )
+
+    # Tracking
+    unmatched_roles = {}
+    stats = new_stats()
+    stats["total_rows"] = parsed["total_rows"]
+    stats["rows_with_user_id"] = len(parsed["rows"])
+    stats["rows_without_user_id"] = parsed["rows_without_user_id"]
+
+    users_file, write_users = csv_batch_writer(users_output, USERS_FIELDS)
+    experience_file, write_experience = csv_batch_writer(experience_output, EXPERIENCE_FIELDS)
+    pipeline["users"] = {}
+    pipeline["experience"] = {}
+
+    mapped = []
+
+    def iter_users(users_writer: PipelineWriter) -> Iterator[dict]:
+        """Write each result's users row as it is mapped, then pass it on."""
+        for result in results:
+            mapped.append(result)
+            if result["user"]:
+                users_writer.write(result["user"])
+                stats["users_with_updates"] += 1
+
+            record_unmatched_roles(unmatched_roles, result["user_id"], result["unmatched"])
+            yield result
+
+    try:
+        # --- Users Update CSV, written as rows are mapped ---
+        with PipelineWriter(write_users, pipeline["users"]) as users_writer:
+            experience = iter_experience(iter_users(users_writer))
+
+            # --- Dedupe Experience ---
+            if users_are_grouped(parsed["rows"]):
+                deduped = dedupe_grouped_experience(experience, stats)
+            else:
+                deduped = dedupe_spilled_experience(experience, stats)
+
+            with PipelineWriter(write_experience, pipeline["experience"]) as experience_writer:
+                for rec, is_other in deduped:
+                    experience_writer.write(rec)
+                    stats["experience_records"] += 1
+                    stats["other_experience" if is_other else "dttd_experience"] += 1
+    finally:
+        for state in (users_file, experience_file):
+            if state["file"] is not None:
+                state["file"].close()
+
+    # An output with no rows isn't written; drop any copy left by an earlier
+    # run (e.g. in watch mode) so it can't be mistaken for this one's
+    for state, path, label in (
+        (users_file, users_output, "Users update"),
+        (experience_file, experience_output, "Experience"),
+    ):
+        if state["file"] is not None:
+            print(f"  {label}: {path}")
+        else:
+            path.unlink(missing_ok=True)
+
+    write_reports(
+        input_path, output_suffix, stats, unmatched_roles, parsed["unparsed_weekends"], pipeline
+    )
+    return mapped
+
+
+def new_stats() -> dict:
+    return {
+        "total_rows": 0,
+        "rows_with_user_id": 0,
+        "rows_without_user_id": 0,
+        "users_with_updates": 0,
+        "experience_records": 0,
+        "dttd_experience": 0,
+        "other_experience": 0,
+        "duplicate_experience": 0,
+    }
+
+
+def write_reports(
+    input_path: Path,
+    output_suffix: str,
+    stats: dict,
+    unmatched_roles: dict,
+    unparsed_weekends: list[str],
+    pipeline: Optional[dict] = None
+):
+    """
+    Write the unmatched roles report and stats file, and print the summary.
+    `pipeline` holds per-stage queue stats to include in the stats file.
+    """
+    output_dir = input_path.parent
+    unmatched_output = output_dir / f"unmatched_roles_{output_suffix}.txt"
+    stats_output = output_dir / f"conversion_stats_{output_suffix}.txt"
 
     # Unmatched roles
     if unmatched_roles:
-        with open(unmatched_output, "w", encoding="utf-8") as f:
-            f.write("Roles that couldn't be mapped:\n")
-            f.write("=" * 50 + "\n\n")
-            for role in sorted(unmatched_roles):
-                f.write(f"  {role}\n")
+        unmatched_stats = {}
+        write_unmatched_report(unmatched_output, unmatched_roles, unmatched_stats)
+        if pipeline is not None:
+            pipeline["unmatched"] = unmatched_stats
         print(f"  Unmatched roles: {unmatched_output}")
+    else:
+        # Every role is mapped now; a report from an earlier run would be stale
+        unmatched_output.unlink(missing_ok=True)
 
     # Stats
     with open(stats_output, "w", encoding="utf-8") as f:
@@ -663,8 +1069,19 @@ def process_roster(input_path: Path, output_suffix: str):
         f.write(f"Experience records:       {stats['experience_records']}\n")
         f.write(f"  - DTTD experience:      {stats['dttd_experience']}\n")
         f.write(f"  - Other experience:     {stats['other_experience']}\n")
+        f.write(f"Duplicates removed:       {stats['duplicate_experience']}\n")
         f.write(f"\n")
         f.write(f"Unmatched roles:          {len(unmatched_roles)}\n")
+        f.write(f"  - Occurrences:          {sum(e['count'] for e in unmatched_roles.values())}\n")
+        f.write(f"Unparsed weekend parts:   {len(unparsed_weekends)}\n")
+        if unparsed_weekends:
+            f.write("\nUnparsed 'Weekend Served' fragments:\n")
+            for fragment in unparsed_weekends:
+                f.write(f"  {fragment}\n")
+        if pipeline:
+            f.write("\nPipeline (queue depth and stall time per stage):\n")
+            for line in format_pipeline_stats(pipeline):
+                f.write(f"  {line}\n")
     print(f"  Stats: {stats_output}")
 
     # Print summary
@@ -675,29 +1092,595 @@ def process_roster(input_path: Path, output_suffix: str):
     print(f"With user_id:         {stats['rows_with_user_id']}")
     print(f"Users with updates:   {stats['users_with_updates']}")
     print(f"Experience records:   {stats['experience_records']}")
+    print(f"Duplicates removed:   {stats['duplicate_experience']}")
     print(f"Unmatched roles:      {len(unmatched_roles)}")
+    print(f"Unparsed weekends:    {len(unparsed_weekends)}")
+
+
+def process_roster(
+    input_path: Path,
+    output_suffix: str,
+    use_cache: bool = True,
+    compress: Optional[str] = None
+):
+    """
+    Process the roster CSV and generate output files.
+
+    Returns:
+        (parsed, results) so callers such as watch mode can re-map selectively
+    """
+    print(f"Processing {input_path}...")
+
+    pipeline = {"read": {}}
+
+    # --- Parse Stage (cached) ---
+    parsed = load_parsed_roster(input_path, use_cache, pipeline["read"])
+
+    # --- Mapping Stage, feeding the writer threads row by row ---
+    results = write_outputs(
+        input_path, output_suffix, parsed, (map_row(row) for row in parsed["rows"]),
+        compress, pipeline
+    )
+    return parsed, results
+
+
+# =============================================================================
+# CHECKPOINTED CONVERSION
+# =============================================================================
+
+# Rows converted between checkpoints when --resume is used without --checkpoint-every
+DEFAULT_CHECKPOINT_ROWS = 10_000
+
+# Bump whenever the checkpoint file layout changes
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_paths(input_path: Path, output_suffix: str) -> tuple[Path, Path]:
+    """Checkpoint file and the SQLite set of experience keys it goes with."""
+    output_dir = input_path.parent
+    return (
+        output_dir / f"conversion_checkpoint_{output_suffix}.json",
+        output_dir / f"conversion_checkpoint_{output_suffix}.db",
+    )
+
+
+def fsync_file(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def write_checkpoint(path: Path, checkpoint: dict) -> None:
+    """Atomically replace the checkpoint file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        fsync_file(f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Path, input_path: Path) -> dict:
+    """
+    Load a checkpoint, refusing one taken from a different input file or
+    with different mapping tables (its outputs would not line up).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    stat = input_path.stat()
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise RuntimeError(f"Unsupported checkpoint version in {path}; rerun without --resume")
+    if (checkpoint["input_size"], checkpoint["input_mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        raise RuntimeError(f"{input_path} changed since {path} was written; rerun without --resume")
+    if checkpoint["mappings_fingerprint"] != MAPPINGS["fingerprint"]:
+        raise RuntimeError(f"Mappings changed since {path} was written; rerun without --resume")
+    return checkpoint
+
+
+def iter_records_with_offsets(f, state: dict, fieldnames: Optional[list[str]] = None):
+    """
+    Read CSV records from a binary file, keeping state["offset"] at the byte
+    position just past the last record returned. csv never reads ahead of the
+    record it is building, so the offset is always a record boundary.
+    """
+    def lines():
+        for raw in f:
+            state["offset"] += len(raw)
+            yield raw.decode("utf-8")
+
+    reader = csv.DictReader(lines(), fieldnames=fieldnames)
+    for row in reader:
+        state["fieldnames"] = reader.fieldnames
+        yield row
+
+
+def open_input_at(input_path: Path, offset: int):
+    """Open the input for binary reading positioned at `offset` (decompressed bytes)."""
+    f = open_binary(input_path, "rb")
+    if f.seekable():
+        f.seek(offset)
+    else:
+        remaining = offset
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+    return f
+
+
+def open_checkpointed_output(path: Path, fieldnames: list[str], size: Optional[int]):
+    """
+    Open an output CSV for appending. On resume it is first truncated back to
+    its size at the checkpoint, dropping rows written after it.
+    """
+    if size is None:
+        f = open(path, "w", encoding="utf-8", newline="")
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        return f, writer
+
+    with open(path, "r+b") as raw:
+        raw.truncate(size)
+    f = open(path, "a", encoding="utf-8", newline="")
+    return f, csv.DictWriter(f, fieldnames=fieldnames)
+
+
+def finish_output(path: Path, rows: int, compress: Optional[str], label: str) -> None:
+    """Drop an output with no rows, or compress it now that it is complete."""
+    if not rows:
+        path.unlink()
+        if compress:
+            with_compression(path, compress).unlink(missing_ok=True)
+        return
+
+    if compress:
+        compressed = with_compression(path, compress)
+        with open(path, "r", encoding="utf-8", newline="") as src:
+            with open_text(compressed, "w", newline="") as dst:
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+        path.unlink()
+        path = compressed
+    print(f"  {label}: {path}")
+
+
+def convert_with_checkpoints(
+    input_path: Path,
+    output_suffix: str,
+    checkpoint_rows: int = DEFAULT_CHECKPOINT_ROWS,
+    resume: bool = False,
+    compress: Optional[str] = None
+):
+    """
+    Convert the roster in one streaming pass, writing outputs as it goes.
+
+    Every `checkpoint_rows` input rows the outputs are fsynced and a checkpoint
+    records the input byte offset, output sizes, stats, unparsed weekends and
+    unmatched roles. With `resume`, conversion continues from the last
+    checkpoint. Experience dedupe keys live in a SQLite file tagged with the
+    checkpoint they were added in, so keys added after it are discarded on resume.
+    Compressed outputs are written plain and compressed once complete.
+    """
+    checkpoint_path, seen_path = checkpoint_paths(input_path, output_suffix)
+    output_dir = input_path.parent
+    users_output = output_dir / f"users_update_{output_suffix}.csv"
+    experience_output = output_dir / f"users_experience_{output_suffix}.csv"
+
+    checkpoint = None
+    if resume:
+        if checkpoint_path.exists():
+            checkpoint = load_checkpoint(checkpoint_path, input_path)
+            print(f"Resuming {input_path} from row {checkpoint['stats']['total_rows']} "
+                  f"(checkpoint {checkpoint['batch']})...")
+        else:
+            print(f"No checkpoint found at {checkpoint_path}, starting from the beginning")
+    if checkpoint is None:
+        print(f"Processing {input_path} with checkpoints every {checkpoint_rows} rows...")
+        seen_path.unlink(missing_ok=True)
+
+    if checkpoint:
+        stats = checkpoint["stats"]
+        unparsed_weekends = checkpoint["unparsed_weekends"]
+        unmatched_roles = {
+            key: {**entry, "users": set(entry["users"])}
+            for key, entry in checkpoint["unmatched_roles"].items()
+        }
+        state = {"offset": checkpoint["offset"], "fieldnames": checkpoint["fieldnames"]}
+        batch = checkpoint["batch"]
+    else:
+        stats = new_stats()
+        unparsed_weekends = []
+        unmatched_roles = {}
+        state = {"offset": 0, "fieldnames": None}
+        batch = 0
+
+    seen = sqlite3.connect(seen_path)
+    try:
+        seen.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, batch INTEGER) WITHOUT ROWID"
+        )
+        seen.execute("DELETE FROM seen WHERE batch > ?", (batch,))
+        seen.commit()
+
+        users_f, users_writer = open_checkpointed_output(
+            users_output, USERS_FIELDS, checkpoint["users_bytes"] if checkpoint else None
+        )
+        experience_f, experience_writer = open_checkpointed_output(
+            experience_output, EXPERIENCE_FIELDS,
+            checkpoint["experience_bytes"] if checkpoint else None
+        )
+
+        def save_checkpoint():
+            fsync_file(users_f)
+            fsync_file(experience_f)
+            seen.commit()
+            write_checkpoint(checkpoint_path, {
+                "version": CHECKPOINT_VERSION,
+                "input": str(input_path),
+                "input_size": input_stat.st_size,
+                "input_mtime_ns": input_stat.st_mtime_ns,
+                "mappings_fingerprint": MAPPINGS["fingerprint"],
+                "batch": batch,
+                "offset": state["offset"],
+                "fieldnames": state["fieldnames"],
+                "users_bytes": users_f.tell(),
+                "experience_bytes": experience_f.tell(),
+                "stats": stats,
+                "unparsed_weekends": unparsed_weekends,
+                "unmatched_roles": {
+                    key: {**entry, "users": sorted(entry["users"])}
+                    for key, entry in unmatched_roles.items()
+                },
+            })
+
+        input_stat = input_path.stat()
+        try:
+            with open_input_at(input_path, state["offset"]) as f:
+                for row in iter_records_with_offsets(f, state, state["fieldnames"]):
+                    stats["total_rows"] += 1
+
+                    if not row.get("user_id", "").strip():
+                        stats["rows_without_user_id"] += 1
+                    else:
+                        stats["rows_with_user_id"] += 1
+                        result = map_row(parse_row(row, unparsed_weekends))
+
+                        if result["user"]:
+                            users_writer.writerow(result["user"])
+                            stats["users_with_updates"] += 1
+                        record_unmatched_roles(
+                            unmatched_roles, result["user_id"], result["unmatched"]
+                        )
+
+                        for rec, is_other in iter_experience([result]):
+                            digest = experience_digest(rec)
+                            cursor = seen.execute(
+                                "INSERT OR IGNORE INTO seen VALUES (?, ?)", (digest, batch + 1)
+                            )
+                            if cursor.rowcount == 0:
+                                stats["duplicate_experience"] += 1
+                                continue
+                            experience_writer.writerow(rec)
+                            stats["experience_records"] += 1
+                            stats["other_experience" if is_other else "dttd_experience"] += 1
+
+                    if stats["total_rows"] % checkpoint_rows == 0:
+                        batch += 1
+                        save_checkpoint()
+        finally:
+            users_f.close()
+            experience_f.close()
+    finally:
+        seen.close()
+
+    finish_output(users_output, stats["users_with_updates"], compress, "Users update")
+    finish_output(experience_output, stats["experience_records"], compress, "Experience")
+    write_reports(input_path, output_suffix, stats, unmatched_roles, unparsed_weekends)
+
+    checkpoint_path.unlink(missing_ok=True)
+    seen_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# ESTIMATE MODE
+# =============================================================================
+
+def measure_sampled_row(row: dict, writers: dict) -> dict:
+    """
+    Run the real parse and mapping stages on one sampled row and measure
+    what it would add to each output. `writers` maps 'users'/'experience' to
+    (StringIO, DictWriter) pairs reused across rows.
+    """
+    start = time.perf_counter()
+    measured = {
+        "with_user_id": 0, "users": 0, "users_bytes": 0, "experience": 0,
+        "experience_bytes": 0, "unmatched": 0, "with_unmatched": 0, "unparsed": 0,
+        "roles": [],
+    }
+
+    def drain(name: str) -> int:
+        buffer = writers[name][0]
+        size = len(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate(0)
+        return size
+
+    if row.get("user_id", "").strip():
+        unparsed_weekends = []
+        result = map_row(parse_row(row, unparsed_weekends))
+        measured["with_user_id"] = 1
+        measured["unparsed"] = len(unparsed_weekends)
+
+        if result["user"]:
+            writers["users"][1].writerow(result["user"])
+            measured["users"] = 1
+            measured["users_bytes"] = drain("users")
+
+        for rec, _ in dedupe_grouped_experience(iter_experience([result]), new_stats()):
+            writers["experience"][1].writerow(rec)
+            measured["experience"] += 1
+        measured["experience_bytes"] = drain("experience")
+
+        measured["unmatched"] = len(result["unmatched"])
+        measured["with_unmatched"] = 1 if result["unmatched"] else 0
+        measured["roles"] = [role.lower().strip() for role, _ in result["unmatched"]]
+
+    measured["seconds"] = time.perf_counter() - start
+    return measured
+
+
+def estimate_roster(input_path: Path, sample_size: int, seed: int) -> None:
+    """
+    Estimate what a full conversion would produce from a seeded reservoir
+    sample of rows, without writing any output files.
+    """
+    print(f"Sampling {sample_size} rows from {input_path} (seed {seed})...")
+
+    with open_text(input_path, "r") as f:
+        sample, total_rows, read_seconds = reservoir_sample(csv.DictReader(f), sample_size, seed)
+
+    writers = {}
+    for name, fieldnames in (("users", USERS_FIELDS), ("experience", EXPERIENCE_FIELDS)):
+        buffer = io.StringIO()
+        writers[name] = (buffer, csv.DictWriter(buffer, fieldnames=fieldnames))
+    measurements = [measure_sampled_row(row, writers) for _, row in sample]
+
+    def total(key: str) -> dict:
+        return estimate_total([m[key] for m in measurements], total_rows)
+
+    with_user_id = total("with_user_id")
+    users = total("users")
+    experience = total("experience")
+    unmatched_rate = scale_estimate(total("with_unmatched"), 1 / total_rows if total_rows else 0)
+    header_bytes = len(",".join(USERS_FIELDS)) + len(",".join(EXPERIENCE_FIELDS)) + 4
+    output_bytes = scale_estimate(
+        estimate_total([m["users_bytes"] + m["experience_bytes"] for m in measurements], total_rows),
+        1, header_bytes
+    )
+    runtime = scale_estimate(total("seconds"), 1, read_seconds)
+    sample_roles = {role for m in measurements for role in m["roles"]}
+
+    print("\n" + "=" * 50)
+    print("CONVERSION ESTIMATE")
+    print("=" * 50)
+    print(f"{'Total rows:':<26}{total_rows:>12,}  (sampled {len(sample)})")
+    print(format_estimate("With user_id:", with_user_id))
+    print(format_estimate("Users with updates:", users))
+    print(format_estimate("Experience records:", experience))
+    print(format_estimate("Unmatched occurrences:", total("unmatched")))
+    print(format_estimate("Rows with unmatched roles:", unmatched_rate, "percent"))
+    print(format_estimate("Unparsed weekend parts:", total("unparsed")))
+    print(format_estimate("Users + experience size:", output_bytes, "bytes"))
+    print(format_estimate("Expected runtime:", runtime, "seconds"))
+    print(f"{'Distinct unmatched roles:':<26}{len(sample_roles):>12,}  (in sample)")
+    print("\nExperience records are counted before cross-row deduplication, so the")
+    print("full run may write fewer. Runtime includes the measured read time of the")
+    print("whole file; caching, compression and reports add to it.")
+
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+# Seconds between checks of the mappings file for changes
+WATCH_INTERVAL = 1.0
+
+
+def diff_mappings(old: dict, new: dict) -> tuple[set[str], set[str], bool]:
+    """
+    Compare two compiled mapping tables.
+
+    Returns:
+        (role_keys, talk_keys, skip_patterns_changed) where role_keys are
+        lowercased roles whose mapping or skip status changed and talk_keys
+        are lowercased talks whose rollo mapping changed
+    """
+    def changed_keys(a: dict, b: dict) -> set[str]:
+        return {key for key in a.keys() | b.keys() if a.get(key) != b.get(key)}
+
+    role_keys = changed_keys(old["role_mapping"], new["role_mapping"])
+    role_keys |= old["skip_roles"] ^ new["skip_roles"]
+    talk_keys = changed_keys(old["rollo_mapping"], new["rollo_mapping"])
+    return role_keys, talk_keys, old["skip_patterns"] != new["skip_patterns"]
+
+
+def index_rows(parsed: dict) -> tuple[dict, dict]:
+    """
+    Build inverted indexes from lowercased base roles and talks to the
+    positions (in parsed["rows"]) of the rows that contain them.
+    """
+    roles_index = {}
+    talks_index = {}
+
+    for i, row in enumerate(parsed["rows"]):
+        _, _, tokens, _, talks, other_tokens, other_talks = row
+        for token in tokens + other_tokens:
+            roles_index.setdefault(token[1].lower().strip(), set()).add(i)
+        for talk in talks + other_talks:
+            talks_index.setdefault(talk.lower().strip(), set()).add(i)
+
+    return roles_index, talks_index
+
+
+def watch_mappings(
+    input_path: Path,
+    output_suffix: str,
+    mappings_path: Path,
+    parsed: dict,
+    results: list[dict],
+    use_cache: bool = True,
+    compress: Optional[str] = None
+):
+    """
+    Poll the mappings file and rewrite outputs whenever it changes.
+
+    Only rows whose positions (or talks) are affected by the table diff are
+    re-mapped. A change to the rollista patterns invalidates the parse stage,
+    so it triggers a full re-parse instead.
+    """
+    roles_index, talks_index = index_rows(parsed)
+    last_mtime = mappings_path.stat().st_mtime_ns
+
+    print(f"\nWatching {mappings_path} for changes (Ctrl+C to stop)...")
+
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+
+            try:
+                mtime = mappings_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue  # Editors may briefly remove the file while saving
+            if mtime == last_mtime:
+                continue
+            last_mtime = mtime
+
+            old = MAPPINGS
+            try:
+                new = load_mappings(mappings_path)
+            except (OSError, ValueError, re.error) as e:
+                print(f"ERROR: Could not load {mappings_path}: {e}")
+                continue
+            use_mappings(new)
+
+            if new["rollista_fingerprint"] != old["rollista_fingerprint"]:
+                print("\nRollista patterns changed, re-parsing roster...")
+                parsed, results = process_roster(
+                    input_path, output_suffix, use_cache, compress
+                )
+                roles_index, talks_index = index_rows(parsed)
+                continue
+
+            role_keys, talk_keys, skip_patterns_changed = diff_mappings(old, new)
+
+            if skip_patterns_changed:
+                role_keys.update(
+                    role for role in roles_index
+                    if should_skip_role(role, old) != should_skip_role(role, new)
+                )
+
+            affected = set()
+            for role in role_keys:
+                affected |= roles_index.get(role, set())
+            for talk in talk_keys:
+                affected |= talks_index.get(talk, set())
+
+            print(f"\nMappings changed: re-mapping {len(affected)} of {len(results)} rows...")
+            if not affected:
+                continue
+
+            for i in affected:
+                results[i] = map_row(parsed["rows"][i])
+
+            write_outputs(input_path, output_suffix, parsed, results, compress)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/convert_roster.py <roster_with_ids_file>")
-        print("\nExample:")
-        print("  python scripts/convert_roster.py roster_with_ids-women.csv")
+    parser = argparse.ArgumentParser(
+        description="Convert roster_with_ids.csv into Supabase import CSVs.",
+        epilog="Example: python scripts/convert_roster.py roster_with_ids-women.csv",
+    )
+    parser.add_argument("input_file", help="Roster CSV with user_id column (output of Phase 1)")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse the roster instead of using the .ir sidecar cache",
+    )
+    parser.add_argument(
+        "--mappings",
+        type=Path,
+        default=DEFAULT_MAPPINGS_PATH,
+        help=f"Role mapping tables (default: {DEFAULT_MAPPINGS_PATH.name})",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-map affected rows whenever the mappings file changes",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(set(COMPRESSION_SUFFIXES.values())),
+        help="Compress the users update and experience CSVs (.gz or .zst)",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        metavar="ROWS",
+        help="Stream the conversion, fsyncing outputs and saving a checkpoint every ROWS rows",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted checkpointed conversion from its last checkpoint",
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Dry run: convert a random sample of rows and extrapolate output counts, "
+             "sizes and runtime (writes no files)",
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help=f"Rows sampled by --estimate (default {DEFAULT_SAMPLE_SIZE})",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Random seed for --estimate sampling (default {DEFAULT_SEED})",
+    )
+    args = parser.parse_args()
+
+    checkpointed = args.resume or args.checkpoint_every is not None
+    if checkpointed and args.watch:
+        parser.error("--watch cannot be combined with --checkpoint-every/--resume")
+
+    try:
+        use_mappings(load_mappings(args.mappings))
+    except (OSError, ValueError, re.error) as e:
+        print(f"ERROR: Could not load mappings from {args.mappings}: {e}")
         return 1
 
-    input_file = Path(sys.argv[1])
+    input_file = Path(args.input_file)
 
     if not input_file.exists():
         # Try in project root
         project_root = Path(__file__).parent.parent
-        input_file = project_root / sys.argv[1]
+        input_file = project_root / args.input_file
 
     if not input_file.exists():
-        print(f"ERROR: File not found: {sys.argv[1]}")
+        print(f"ERROR: File not found: {args.input_file}")
         return 1
 
     # Determine output suffix from input filename
-    stem = input_file.stem
+    stem = strip_compression_suffix(input_file).stem
     if "women" in stem.lower():
         suffix = "women"
     elif "men" in stem.lower():
@@ -705,7 +1688,28 @@ def main():
     else:
         suffix = stem.replace("roster_with_ids", "").strip("-_") or "output"
 
-    process_roster(input_file, suffix)
+    use_cache = not args.no_cache
+    try:
+        if args.estimate:
+            estimate_roster(input_file, max(1, args.sample_size), args.seed)
+            return 0
+
+        if checkpointed:
+            convert_with_checkpoints(
+                input_file, suffix, max(1, args.checkpoint_every or DEFAULT_CHECKPOINT_ROWS),
+                args.resume, args.compress
+            )
+            return 0
+
+        parsed, results = process_roster(input_file, suffix, use_cache, args.compress)
+
+        if args.watch:
+            watch_mappings(
+                input_file, suffix, args.mappings, parsed, results, use_cache, args.compress
+            )
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
     return 0
 
 
@@ -1,19 +1,72 @@
 #!/usr/bin/env python3
 """
-Generate SQL UPDATE statements from a CSV file for any database table.
+Generate SQL UPDATE (or bulk INSERT) statements from a CSV file for any database table.
 
-This script reads a CSV file and generates UPDATE statements for a specified table.
+This script reads a CSV file and generates UPDATE statements for a specified table,
+or multi-row INSERT ... ON CONFLICT statements with --mode insert/upsert.
 It works with any table - simply ensure CSV column names match database column names.
 
 Usage:
     python csv_to_sql_updates.py <csv_file> <table_name> <id_column> [output_sql]
+        [--snapshot table_export.csv]
 
 Arguments:
     csv_file    - Path to the input CSV file (column names must match DB columns)
     table_name  - Name of the table to update (e.g., public.users, public.candidates)
-    id_column   - Column name in CSV that maps to the table's primary key (used in WHERE clause)
+    id_column   - Column name in CSV that maps to the table's primary key (used in WHERE clause;
+                  in insert modes it only keys sharding, e.g. user_id)
     output_sql  - Optional output file path (defaults to stdout)
 
+Options:
+    --snapshot  - CSV export of the target table's current contents. Only columns
+                  whose values differ from the snapshot are SET, and rows with no
+                  differences are dropped
+    --schema    - Where to read column types: a migrations directory, a .sql DDL
+                  file, or a .json {column: type} file. Defaults to the repo's
+                  supabase/migrations. Each column gets one encoder with an
+                  explicit cast (jsonb, uuid, timestamptz, numeric, ...)
+    --shards    - Hash-partition rows by id_column into N shards generated in
+                  parallel. Writes <output>_shardNNN_PPP.sql files plus
+                  <output>_manifest.json (statement and row counts, sizes,
+                  sha256 checksums).
+                  Shards never touch the same rows, so they can be applied
+                  concurrently. Requires output_sql
+    --max-shard-bytes - Size cap per shard file (default 1000000); larger
+                  shards are split into several parts, and multi-row INSERTs
+                  are ended early to fit. A single statement that is still
+                  too big gets its own file and a warning
+    --mode      - update (default), insert (ON CONFLICT DO NOTHING) or upsert
+                  (ON CONFLICT (...) DO UPDATE). Insert modes emit multi-row
+                  INSERT ... VALUES statements; empty cells become NULL
+    --rows-per-statement - VALUES tuples per INSERT (default 1000)
+    --conflict-columns - Comma-separated ON CONFLICT target, e.g.
+                  user_id,cha_role,rollo,weekend_reference. Must match a unique
+                  index; required for upsert. If they cover every CSV
+                  column there is nothing to update, so DO NOTHING is used
+    --valid-users - CSV export of users (id column) to validate references
+                  against: user_id, and the id column when updating
+                  public.users. Rows pointing at unknown users are written to
+                  the reject file instead of the SQL, so the apply can't fail
+                  halfway on a foreign key
+    --valid-weekends - CSV export of known weekend references
+                  (weekend_reference column) to validate weekend_reference.
+                  "Other" (used for Other Experience records) is always valid
+    --reject    - Reject file for rows failing validation, with line number
+                  and reason (default <csv_file stem>_rejects.csv)
+    --reconcile - CSV export of the target table (insert modes). For every
+                  user (id_column) in the CSV, rows in the export that the CSV
+                  no longer contains are removed with batched
+                  DELETE ... WHERE (...) IN (VALUES ...) statements written
+                  before the INSERTs, and rows the export already holds are
+                  not inserted again, so a rerun converges in one pass
+    --reconcile-columns - Columns identifying a row when reconciling
+                  (default user_id,cha_role,rollo,weekend_reference)
+    --estimate  - Dry run: generate SQL for a random sample of rows and
+                  extrapolate statement count, SQL size and runtime with 95%
+                  confidence intervals. Writes nothing
+    --sample-size - Rows sampled by --estimate (default 1000)
+    --seed      - Random seed for --estimate sampling (default 0)
+
 Examples:
     # Update users table
     python csv_to_sql_updates.py users_data.csv public.users id output.sql
@@ -24,19 +77,63 @@ Examples:
     # Output to stdout
     python csv_to_sql_updates.py data.csv public.any_table id
 
+    # Compressed input and output (by extension: .gz, or .zst with zstandard installed)
+    python csv_to_sql_updates.py users_update.csv.gz public.users id output.sql.gz
+
+    # Bulk insert experience records, 500 rows per statement
+    python csv_to_sql_updates.py users_experience.csv public.users_experience user_id experience.sql --mode insert --rows-per-statement 500
+
+    # 8 shards of at most 500KB each, for parallel apply
+    python csv_to_sql_updates.py users_update.csv public.users id output.sql --shards 8 --max-shard-bytes 500000
+
+    # Leave out experience rows for users that no longer exist
+    python csv_to_sql_updates.py users_experience.csv public.users_experience user_id experience.sql --mode insert --valid-users users_ids.csv
+
+    # Re-import corrected experience records, deleting ones no longer in the roster
+    python csv_to_sql_updates.py users_experience.csv public.users_experience user_id experience.sql --mode insert --reconcile users_experience_export.csv
+
+    # Skip values the database already holds
+    python csv_to_sql_updates.py users_update.csv public.users id output.sql --snapshot users_export.csv
+
 Notes:
     - CSV column names must exactly match the database column names
     - Empty values in the CSV are skipped (columns won't be set to empty strings)
-    - JSON values (starting with { or [) are automatically parsed and formatted
+    - Column types come from the schema; columns it doesn't know fall back to
+      detection, where JSON values (starting with { or [) are parsed and formatted
     - Single quotes in values are escaped for SQL safety
 """
 
+import argparse
 import csv
+import hashlib
+import math
+import os
+import re
 import sys
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 
+from roster_io import (
+    compression_for,
+    format_pipeline_stats,
+    open_binary,
+    open_text,
+    pipelined_reader,
+    strip_compression_suffix,
+    with_compression,
+)
+from roster_estimate import (
+    DEFAULT_SAMPLE_SIZE,
+    DEFAULT_SEED,
+    estimate_total,
+    format_estimate,
+    reservoir_sample,
+    scale_estimate,
+)
+
 
 def is_json_value(value: str) -> bool:
     """Check if a string value looks like JSON."""
@@ -50,15 +147,17 @@ def clean_json_value(value: str) -> Optional[str]:
     if not value or value.strip() == "":
         return None
 
-    # The CSV may have escaped quotes like ""key"" - handle this
-    cleaned = value.replace('""', '"')
+    # Try the value as-is first; the CSV may also have escaped quotes like
+    # ""key"" - handle this (blindly unescaping first would break "" values)
+    for candidate in (value, value.replace('""', '"')):
+        try:
+            parsed = json.loads(candidate)
+            return json.dumps(parsed)
+        except json.JSONDecodeError:
+            continue
 
-    try:
-        parsed = json.loads(cleaned)
-        return json.dumps(parsed)
-    except json.JSONDecodeError:
-        # If it's not valid JSON, return None
-        return None
+    # If it's not valid JSON, return None
+    return None
 
 
 def escape_sql_string(value: str) -> str:
@@ -82,7 +181,303 @@ def format_sql_value(value: str) -> Optional[str]:
     return f"'{escape_sql_string(value.strip())}'"
 
 
-def generate_update_statement(row: dict, table_name: str, id_column: str) -> Optional[str]:
+# =============================================================================
+# SCHEMA-AWARE ENCODING
+# =============================================================================
+
+# Migrations used for column types when --schema isn't given
+DEFAULT_SCHEMA_PATH = Path(__file__).resolve().parents[2] / "supabase" / "migrations"
+
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*")
+_CREATE_TABLE_RE = re.compile(
+    r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w\".]+)\s*\((.*)\)[^)]*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ALTER_TABLE_RE = re.compile(
+    r"^\s*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w\".]+)\s+(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DROP_TABLE_RE = re.compile(
+    r"^\s*DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?([\w\".]+)", re.IGNORECASE
+)
+_ADD_COLUMN_RE = re.compile(
+    r"^ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\"?\w+\"?)\s+(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DROP_COLUMN_RE = re.compile(
+    r"^DROP\s+(?:COLUMN\s+)?(?:IF\s+EXISTS\s+)?(\"?\w+\"?)", re.IGNORECASE
+)
+_RENAME_COLUMN_RE = re.compile(
+    r"^RENAME\s+(?:COLUMN\s+)?(\"?\w+\"?)\s+TO\s+(\"?\w+\"?)", re.IGNORECASE
+)
+_ALTER_COLUMN_TYPE_RE = re.compile(
+    r"^ALTER\s+(?:COLUMN\s+)?(\"?\w+\"?)\s+(?:SET\s+DATA\s+)?TYPE\s+(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_TABLE_CONSTRAINT_RE = re.compile(
+    r"^(?:CONSTRAINT|PRIMARY|UNIQUE|FOREIGN|CHECK|EXCLUDE|LIKE)\b", re.IGNORECASE
+)
+_TYPE_END_RE = re.compile(
+    r"\s+(?:DEFAULT|NOT\s+NULL|NULL|PRIMARY\s+KEY|REFERENCES|UNIQUE|CHECK"
+    r"|CONSTRAINT|GENERATED|COLLATE|USING)\b",
+    re.IGNORECASE,
+)
+_TEXT_TYPE_RE = re.compile(r"^(?:text|varchar|character varying|char|character|bpchar)\b")
+
+
+def normalize_table_name(name: str) -> str:
+    """'"public"."users"' -> 'public.users'; unqualified names default to public."""
+    name = name.replace('"', "").strip().lower()
+    return name if "." in name else f"public.{name}"
+
+
+def normalize_column_type(column_type: str) -> str:
+    """'"text"[]' -> 'text[]', 'timestamp with time zone' -> 'timestamptz'."""
+    column_type = _TYPE_END_RE.split(column_type, maxsplit=1)[0]
+    column_type = " ".join(column_type.replace('"', "").split()).lower()
+    column_type = column_type.replace("timestamp with time zone", "timestamptz")
+    column_type = column_type.replace("timestamp without time zone", "timestamp")
+    return column_type
+
+
+def split_top_level(text: str) -> list[str]:
+    """Split on commas that aren't inside parentheses or quotes."""
+    parts = []
+    depth = 0
+    quote = None
+    current = []
+
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def apply_schema_sql(sql: str, tables: dict) -> None:
+    """
+    Replay the table DDL in `sql` onto `tables` (table name -> {column: type}).
+    Understands CREATE TABLE, DROP TABLE and ALTER TABLE ADD/DROP/RENAME/ALTER
+    COLUMN, which is all the migrations use for column definitions.
+    """
+    sql = _SQL_COMMENT_RE.sub("", sql)
+
+    for statement in sql.split(";"):
+        match = _CREATE_TABLE_RE.match(statement)
+        if match:
+            columns = {}
+            for item in split_top_level(match.group(2)):
+                if not item or _TABLE_CONSTRAINT_RE.match(item):
+                    continue
+                name, _, column_type = item.partition(" ")
+                columns[name.replace('"', "")] = normalize_column_type(column_type)
+            tables[normalize_table_name(match.group(1))] = columns
+            continue
+
+        match = _DROP_TABLE_RE.match(statement)
+        if match:
+            tables.pop(normalize_table_name(match.group(1)), None)
+            continue
+
+        match = _ALTER_TABLE_RE.match(statement)
+        if not match:
+            continue
+        columns = tables.setdefault(normalize_table_name(match.group(1)), {})
+
+        for action in split_top_level(match.group(2)):
+            add = _ADD_COLUMN_RE.match(action)
+            if add and add.group(1).upper() not in ("CONSTRAINT", "PRIMARY", "UNIQUE",
+                                                    "FOREIGN", "CHECK"):
+                columns[add.group(1).replace('"', "")] = normalize_column_type(add.group(2))
+                continue
+            drop = _DROP_COLUMN_RE.match(action)
+            if drop and drop.group(1).upper() != "CONSTRAINT":
+                columns.pop(drop.group(1).replace('"', ""), None)
+                continue
+            rename = _RENAME_COLUMN_RE.match(action)
+            if rename:
+                old, new = (n.replace('"', "") for n in rename.groups())
+                if old in columns:
+                    columns[new] = columns.pop(old)
+                continue
+            retype = _ALTER_COLUMN_TYPE_RE.match(action)
+            if retype:
+                columns[retype.group(1).replace('"', "")] = normalize_column_type(retype.group(2))
+
+
+def load_column_types(schema_path: Path, table_name: str) -> dict:
+    """
+    Read column types for `table_name` from a schema source:
+        - a directory of migrations (*.sql replayed in filename order)
+        - a single .sql DDL file
+        - a .json file mapping column name -> type
+
+    Returns:
+        Dict of column name -> normalized type (empty if the table isn't found)
+    """
+    if schema_path.suffix == ".json":
+        with open(schema_path, "r", encoding="utf-8") as f:
+            return {c: normalize_column_type(t) for c, t in json.load(f).items()}
+
+    files = sorted(schema_path.glob("*.sql")) if schema_path.is_dir() else [schema_path]
+    tables = {}
+    for sql_file in files:
+        apply_schema_sql(sql_file.read_text(encoding="utf-8"), tables)
+
+    return tables.get(normalize_table_name(table_name), {})
+
+
+def encode_text(value: str) -> Optional[str]:
+    """Encode a text column value."""
+    if not value or value.strip() == "":
+        return None
+    return f"'{escape_sql_string(value.strip())}'"
+
+
+def make_json_encoder(cast: str):
+    """Build an encoder that validates and compacts JSON for a json/jsonb column."""
+    def encode(value: str) -> Optional[str]:
+        cleaned_json = clean_json_value(value)
+        if cleaned_json:
+            return f"'{escape_sql_string(cleaned_json)}'::{cast}"
+        return None
+    return encode
+
+
+def make_cast_encoder(cast: str):
+    """Build an encoder that emits a quoted literal with an explicit cast."""
+    def encode(value: str) -> Optional[str]:
+        if not value or value.strip() == "":
+            return None
+        return f"'{escape_sql_string(value.strip())}'::{cast}"
+    return encode
+
+
+def build_encoders(columns: list[str], column_types: dict) -> dict:
+    """
+    Resolve one encoder per CSV column up front. Columns missing from the
+    schema fall back to per-cell sniffing with format_sql_value.
+    """
+    encoders = {}
+    for column in columns:
+        column_type = column_types.get(column)
+        if column_type is None:
+            encoders[column] = format_sql_value
+        elif column_type in ("json", "jsonb"):
+            encoders[column] = make_json_encoder(column_type)
+        elif _TEXT_TYPE_RE.match(column_type) and not column_type.endswith("]"):
+            encoders[column] = encode_text
+        else:
+            # uuid, timestamptz, numeric, boolean, arrays, enums...
+            encoders[column] = make_cast_encoder(column_type)
+    return encoders
+
+
+def resolve_encoders(
+    columns: list[str],
+    table_name: str,
+    schema_path: Optional[str]
+) -> tuple[Optional[dict], Optional[dict]]:
+    """
+    Load column types for the table (from --schema, or the repo migrations
+    when present) and build encoders for the CSV columns.
+
+    Returns:
+        (column_types, encoders), both None when no schema is available
+    """
+    schema = Path(schema_path) if schema_path else DEFAULT_SCHEMA_PATH
+    if not (schema_path or schema.exists()):
+        return None, None
+
+    column_types = load_column_types(schema, table_name)
+    if not column_types:
+        print(f"Warning: {table_name} not found in {schema}, "
+              f"falling back to per-value type detection", file=sys.stderr)
+        return column_types, None
+    return column_types, build_encoders(columns, column_types)
+
+
+def normalize_compare_value(value: str) -> str:
+    """
+    Normalize a value for comparison against a snapshot, so JSON that differs
+    only in key order or whitespace compares equal.
+    """
+    stripped = value.strip() if value else ""
+    if stripped and is_json_value(stripped):
+        for candidate in (stripped, stripped.replace('""', '"')):
+            try:
+                return json.dumps(json.loads(candidate), sort_keys=True)
+            except json.JSONDecodeError:
+                continue
+    return stripped
+
+
+def load_snapshot(snapshot_path: Path, id_column: str, columns: list[str]) -> dict:
+    """
+    Load a CSV export of the target table into a hash index keyed on the id column.
+
+    Only the given columns are kept, already normalized for comparison.
+    Returns a dict of id -> {column: normalized value}.
+    """
+    snapshot = {}
+
+    with open_text(snapshot_path, "r") as f:
+        reader = csv.DictReader(f)
+
+        if reader.fieldnames and id_column not in reader.fieldnames:
+            print(f"Error: ID column '{id_column}' not found in snapshot", file=sys.stderr)
+            sys.exit(1)
+
+        kept = [c for c in columns if reader.fieldnames and c in reader.fieldnames]
+        for row in reader:
+            id_value = row.get(id_column, "").strip()
+            if id_value:
+                snapshot[id_value] = {c: normalize_compare_value(row[c]) for c in kept}
+
+    return snapshot
+
+
+def strip_unchanged_columns(row: dict, snapshot_row: Optional[dict], id_column: str) -> dict:
+    """
+    Return a copy of the row with every column that already matches the
+    snapshot blanked out, so it is left out of the SET clause.
+    """
+    if snapshot_row is None:
+        return row
+
+    stripped = {}
+    for column, value in row.items():
+        if (
+            column != id_column
+            and column in snapshot_row
+            and normalize_compare_value(value) == snapshot_row[column]
+        ):
+            stripped[column] = ""
+        else:
+            stripped[column] = value
+    return stripped
+
+
+def generate_update_statement(
+    row: dict,
+    table_name: str,
+    id_column: str,
+    encoders: Optional[dict] = None
+) -> Optional[str]:
     """
     Generate a SQL UPDATE statement for a single CSV row.
 
@@ -90,6 +485,8 @@ def generate_update_statement(row: dict, table_name: str, id_column: str) -> Opt
         row: Dictionary of column_name -> value from the CSV
         table_name: Fully qualified table name (e.g., public.users)
         id_column: Column name to use in the WHERE clause
+        encoders: Optional column -> encoder table from build_encoders
+            (values are sniffed per cell with format_sql_value otherwise)
 
     Returns:
         SQL UPDATE statement string, or None if row has no valid data
@@ -107,7 +504,8 @@ def generate_update_statement(row: dict, table_name: str, id_column: str) -> Opt
         if column == id_column:
             continue
 
-        formatted_value = format_sql_value(value)
+        encode = encoders.get(column, format_sql_value) if encoders else format_sql_value
+        formatted_value = encode(value)
         if formatted_value:
             set_clauses.append(f"{column} = {formatted_value}")
 
@@ -119,20 +517,740 @@ def generate_update_statement(row: dict, table_name: str, id_column: str) -> Opt
     return f"UPDATE {table_name} SET {set_clause} WHERE {id_column} = '{escape_sql_string(id_value)}';"
 
 
+def build_update_statements(
+    rows,
+    table_name: str,
+    id_column: str,
+    encoders: Optional[dict] = None,
+    snapshot: Optional[dict] = None
+) -> tuple[list[str], list[int], int]:
+    """
+    Generate UPDATE statements for (row_num, row) pairs.
+
+    Returns:
+        (statements, skipped_row_numbers, unchanged_row_count)
+    """
+    statements = []
+    skipped_rows = []
+    unchanged_rows = 0
+
+    for row_num, row in rows:
+        if snapshot is not None:
+            snapshot_row = snapshot.get(row.get(id_column, "").strip())
+            statement = generate_update_statement(
+                strip_unchanged_columns(row, snapshot_row, id_column),
+                table_name, id_column, encoders
+            )
+            if not statement and generate_update_statement(row, table_name, id_column, encoders):
+                unchanged_rows += 1
+                continue
+        else:
+            statement = generate_update_statement(row, table_name, id_column, encoders)
+
+        if statement:
+            statements.append(statement)
+        else:
+            skipped_rows.append(row_num)
+
+    return statements, skipped_rows, unchanged_rows
+
+
+# =============================================================================
+# REFERENTIAL VALIDATION
+# =============================================================================
+
+# Target false-positive rate for the Bloom filters; positives are confirmed
+# against the exact set, so this only affects how often that happens
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+
+# CSV column checked against each reference export, the export column
+# holding the known values (the first column is used if it's missing), and
+# normalized values accepted without being in the export. convert_roster.py
+# writes "Other" as the weekend_reference of every Other Experience record.
+REFERENCE_CHECKS = {
+    "users": {"columns": ["user_id"], "export_column": "id", "always_valid": set()},
+    "weekends": {
+        "columns": ["weekend_reference"],
+        "export_column": "weekend_reference",
+        "always_valid": {"other"},
+    },
+}
+
+
+def normalize_reference(value: str) -> str:
+    return value.strip().casefold() if value else ""
+
+
+def bloom_hashes(value: str, bit_count: int, hash_count: int) -> list[int]:
+    """Bit positions for a value, by double hashing one blake2b digest."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bit_count for i in range(hash_count)]
+
+
+def build_reference_filter(values: set) -> dict:
+    """
+    Build a Bloom filter over a set of known references. Lookups that pass the
+    filter are confirmed against the exact set, so a Bloom collision can
+    never let an unknown reference through.
+    """
+    n = max(1, len(values))
+    bit_count = max(64, int(-n * math.log(BLOOM_FALSE_POSITIVE_RATE) / (math.log(2) ** 2)))
+    hash_count = max(1, round(bit_count / n * math.log(2)))
+    bits = bytearray((bit_count + 7) // 8)
+
+    for value in values:
+        for position in bloom_hashes(value, bit_count, hash_count):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    return {
+        "bits": bits,
+        "bit_count": bit_count,
+        "hash_count": hash_count,
+        "exact": values,
+        "stats": {"filtered": 0, "confirmed": 0, "collisions": 0},
+    }
+
+
+def reference_known(value: str, reference_filter: dict) -> bool:
+    """Check a normalized reference against a filter from build_reference_filter."""
+    bits = reference_filter["bits"]
+    stats = reference_filter["stats"]
+    for position in bloom_hashes(value, reference_filter["bit_count"], reference_filter["hash_count"]):
+        if not bits[position >> 3] & (1 << (position & 7)):
+            stats["filtered"] += 1
+            return False
+
+    if value in reference_filter["exact"]:
+        stats["confirmed"] += 1
+        return True
+    stats["collisions"] += 1
+    return False
+
+
+def load_reference_filter(export_path: Path, export_column: str) -> dict:
+    """Load known references from a CSV export into a Bloom filter."""
+    values = set()
+
+    with open_text(export_path, "r") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = header.index(export_column) if export_column in header else 0
+        for record in reader:
+            if index < len(record):
+                value = normalize_reference(record[index])
+                if value:
+                    values.add(value)
+
+    return build_reference_filter(values)
+
+
+def build_validators(columns: list[str], reference_paths: dict, table_name: str, id_column: str) -> list:
+    """
+    Return (column, kind, filter) for every CSV column that has a reference
+    export to be checked against. reference_paths maps 'users'/'weekends' to
+    an export path (or None). Updates to public.users check their id column.
+    """
+    validators = []
+    for kind, path in reference_paths.items():
+        if not path:
+            continue
+        checked = [c for c in REFERENCE_CHECKS[kind]["columns"] if c in columns]
+        if kind == "users" and normalize_table_name(table_name) == "public.users":
+            checked.append(id_column)
+        if not checked:
+            print(f"Warning: no {' or '.join(REFERENCE_CHECKS[kind]['columns'])} column "
+                  f"to check against {path}", file=sys.stderr)
+            continue
+        reference_filter = load_reference_filter(Path(path), REFERENCE_CHECKS[kind]["export_column"])
+        print(f"Loaded {len(reference_filter['exact'])} known {kind} from {path}", file=sys.stderr)
+        for column in checked:
+            validators.append((column, kind, reference_filter))
+    return validators
+
+
+def validate_rows(rows, validators: list, rejects: list):
+    """
+    Yield the (row_num, row) pairs whose references are all known; the rest
+    are appended to `rejects` with the reason, and never reach the SQL.
+    """
+    for row_num, row in rows:
+        reasons = []
+        for column, kind, reference_filter in validators:
+            value = normalize_reference(row.get(column, ""))
+            if not value:
+                reasons.append(f"missing {column}")
+            elif value in REFERENCE_CHECKS[kind]["always_valid"]:
+                continue
+            elif not reference_known(value, reference_filter):
+                reasons.append(f"unknown {column}")
+
+        if reasons:
+            rejects.append((row_num, "; ".join(reasons), row))
+        else:
+            yield row_num, row
+
+
+def write_rejects(reject_path: Path, columns: list[str], rejects: list) -> None:
+    """Write rejected rows, with their CSV line number and reason, for review."""
+    with open_text(reject_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["line", "reject_reason"] + columns)
+        for row_num, reason, row in rejects:
+            writer.writerow([row_num, reason] + [row.get(c, "") for c in columns])
+
+
+def report_validation(validators: list, rejects: list, reject_path: Path) -> None:
+    """Print reject counts and Bloom filter hit rates to stderr."""
+    seen = set()
+    for _, kind, reference_filter in validators:
+        if id(reference_filter) in seen:
+            continue
+        seen.add(id(reference_filter))
+        stats = reference_filter["stats"]
+        print(f"Validated {kind}: {stats['confirmed']} known, {stats['filtered']} rejected "
+              f"by the Bloom filter, {stats['collisions']} Bloom collisions caught",
+              file=sys.stderr)
+
+    if rejects:
+        print(f"Rejected {len(rejects)} rows with unknown references, written to: {reject_path}",
+              file=sys.stderr)
+
+
+# =============================================================================
+# BULK INSERT
+# =============================================================================
+
+DEFAULT_ROWS_PER_STATEMENT = 1000
+
+
+def format_values_row(row: dict, columns: list[str], encoders: Optional[dict]) -> Optional[str]:
+    """
+    Format one row as a VALUES tuple. Empty cells become NULL (e.g. rollo),
+    since every row of a multi-row INSERT must supply every column.
+    Returns None if the row has no values at all.
+    """
+    values = []
+    for column in columns:
+        encode = encoders.get(column, format_sql_value) if encoders else format_sql_value
+        values.append(encode(row.get(column) or ""))
+
+    if all(value is None for value in values):
+        return None
+    return "(" + ", ".join(value or "NULL" for value in values) + ")"
+
+
+def build_insert_statements(
+    rows,
+    table_name: str,
+    columns: list[str],
+    encoders: Optional[dict],
+    insert_options: dict,
+    statement_rows: Optional[list[int]] = None
+) -> tuple[list[str], list[int], int]:
+    """
+    Generate multi-row INSERT ... VALUES ... ON CONFLICT statements. If
+    `statement_rows` is given, the row count of each statement is appended to it.
+
+    insert_options keys:
+        rows_per_statement: Maximum VALUES tuples per statement
+        on_conflict: "nothing" or "update"
+        conflict_columns: Conflict target columns (required for "update")
+        max_statement_bytes: Optional size cap; a statement that would grow
+            past it is ended early (a single oversized row still gets one)
+
+    For "update", a conflict key repeated within one statement starts a new
+    statement, since Postgres refuses to update the same row twice in one command.
+    When the conflict columns cover every CSV column there is nothing left to
+    update, so "update" falls back to DO NOTHING.
+
+    Returns:
+        (statements, skipped_row_numbers, row_count)
+    """
+    rows_per_statement = insert_options["rows_per_statement"]
+    conflict_columns = insert_options["conflict_columns"]
+    max_bytes = insert_options.get("max_statement_bytes")
+
+    updates = []
+    if insert_options["on_conflict"] == "update":
+        updates = [c for c in columns if c not in conflict_columns]
+
+    conflict = "ON CONFLICT"
+    if conflict_columns:
+        conflict += f" ({', '.join(conflict_columns)})"
+    if updates:
+        conflict += " DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+    else:
+        conflict += " DO NOTHING"
+
+    prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES\n  "
+    # Tuples are joined by ",\n  " and followed by "\n<conflict>;"
+    fixed_bytes = len(prefix.encode("utf-8")) + len(conflict.encode("utf-8")) - 1
+    statements = []
+    skipped_rows = []
+    row_count = 0
+    batch = []
+    batch_keys = set()
+    batch_bytes = fixed_bytes
+
+    def flush():
+        nonlocal batch_bytes
+        if batch:
+            statements.append(prefix + ",\n  ".join(batch) + f"\n{conflict};")
+            if statement_rows is not None:
+                statement_rows.append(len(batch))
+            batch.clear()
+            batch_keys.clear()
+            batch_bytes = fixed_bytes
+
+    for row_num, row in rows:
+        values = format_values_row(row, columns, encoders)
+        if values is None:
+            skipped_rows.append(row_num)
+            continue
+
+        if updates:
+            key = tuple((row.get(c) or "").strip() for c in conflict_columns)
+            if key in batch_keys:
+                flush()
+            batch_keys.add(key)
+
+        size = len(values.encode("utf-8")) + 3
+        if max_bytes and batch and batch_bytes + size > max_bytes:
+            flush()
+            if updates:
+                batch_keys.add(key)
+
+        batch.append(values)
+        batch_bytes += size
+        row_count += 1
+        if len(batch) >= rows_per_statement:
+            flush()
+
+    flush()
+    return statements, skipped_rows, row_count
+
+
+def build_statements(
+    rows,
+    table_name: str,
+    id_column: str,
+    columns: list[str],
+    encoders: Optional[dict],
+    snapshot: Optional[dict],
+    insert_options: Optional[dict],
+    statement_rows: Optional[list[int]] = None
+) -> tuple[list[str], list[int], int]:
+    """
+    Build UPDATE statements, or INSERT statements when insert_options is given.
+    If `statement_rows` is given, the row count of each statement is appended to it.
+
+    Returns:
+        (statements, skipped_row_numbers, unchanged_row_count)
+    """
+    if insert_options:
+        statements, skipped_rows, _ = build_insert_statements(
+            rows, table_name, columns, encoders, insert_options, statement_rows
+        )
+        return statements, skipped_rows, 0
+    statements, skipped_rows, unchanged_rows = build_update_statements(
+        rows, table_name, id_column, encoders, snapshot
+    )
+    if statement_rows is not None:
+        statement_rows.extend([1] * len(statements))
+    return statements, skipped_rows, unchanged_rows
+
+
+# =============================================================================
+# RECONCILE
+# =============================================================================
+
+# Identity of an experience row when reconciling against a table export
+DEFAULT_RECONCILE_COLUMNS = ["user_id", "cha_role", "rollo", "weekend_reference"]
+
+
+def reconcile_digest(row: dict, key_columns: list[str]) -> bytes:
+    """16-byte digest of a row's key values (the first key column is case-folded)."""
+    values = [(row.get(c) or "").strip() for c in key_columns]
+    values[0] = values[0].lower()
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=16).digest()
+
+
+def collect_reconcile_keys(rows, key_columns: list[str], key_sets: dict):
+    """
+    Pass (row_num, row) pairs through, adding each row's key digest to the
+    per-user set in `key_sets` (user -> set of digests).
+    """
+    for row_num, row in rows:
+        user = (row.get(key_columns[0]) or "").strip().lower()
+        if user:
+            key_sets.setdefault(user, set()).add(reconcile_digest(row, key_columns))
+        yield row_num, row
+
+
+def find_stale_rows(
+    export_path: Path,
+    key_columns: list[str],
+    key_sets: dict
+) -> tuple[list[dict], set]:
+    """
+    Stream a CSV export of the table against the new data's key sets.
+    Users the new data doesn't mention are left alone.
+
+    Returns:
+        (stale, present) where stale lists the distinct key rows of users in
+        the new data that it no longer contains, and present holds the digests
+        of new rows the table already has
+    """
+    stale = []
+    present = set()
+    seen = set()
+
+    with open_text(export_path, "r") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in key_columns if c not in (reader.fieldnames or [])]
+        if missing:
+            raise RuntimeError(
+                f"Reconcile column(s) not found in {export_path}: {', '.join(missing)}"
+            )
+
+        for row in reader:
+            user_keys = key_sets.get((row.get(key_columns[0]) or "").strip().lower())
+            if user_keys is None:
+                continue
+            digest = reconcile_digest(row, key_columns)
+            if digest in user_keys:
+                present.add(digest)
+                continue
+            if digest in seen:
+                continue
+            seen.add(digest)
+            stale.append({c: (row.get(c) or "").strip() for c in key_columns})
+
+    return stale, present
+
+
+def skip_present_rows(rows, key_columns: list[str], present: set, reconcile: dict):
+    """
+    Pass through the (row_num, row) pairs the table doesn't already hold, so a
+    rerun inserts only what is new; the rest are counted in
+    reconcile['already_present'].
+    """
+    reconcile["already_present"] = 0
+    for row_num, row in rows:
+        if reconcile_digest(row, key_columns) in present:
+            reconcile["already_present"] += 1
+            continue
+        yield row_num, row
+
+
+def build_delete_statements(
+    stale_rows: list[dict],
+    table_name: str,
+    key_columns: list[str],
+    column_types: Optional[dict],
+    rows_per_statement: int
+) -> list[str]:
+    """
+    Generate set-based DELETE ... WHERE (key columns) IN (VALUES ...) statements,
+    one per chunk of stale rows.
+
+    Row-value IN never matches NULL, so a key column that is empty in any row
+    of a chunk is compared as COALESCE(column::text, '') against text values.
+    """
+    encoders = build_encoders(key_columns, column_types) if column_types else {}
+    statements = []
+
+    for start in range(0, len(stale_rows), rows_per_statement):
+        chunk = stale_rows[start:start + rows_per_statement]
+        nullable = {c for c in key_columns if any(not row[c] for row in chunk)}
+
+        targets = [f"COALESCE({c}::text, '')" if c in nullable else c for c in key_columns]
+        tuples = []
+        for row in chunk:
+            values = []
+            for column in key_columns:
+                if column in nullable:
+                    values.append(f"'{escape_sql_string(row[column])}'")
+                else:
+                    values.append(encoders.get(column, encode_text)(row[column]))
+            tuples.append("(" + ", ".join(values) + ")")
+
+        statements.append(
+            f"DELETE FROM {table_name}\nWHERE ({', '.join(targets)}) IN (VALUES\n  "
+            + ",\n  ".join(tuples) + ");"
+        )
+
+    return statements
+
+
+# =============================================================================
+# SHARDED OUTPUT
+# =============================================================================
+
+# Default size cap per shard file, comfortably below what the Supabase SQL
+# editor accepts in one paste
+DEFAULT_MAX_SHARD_BYTES = 1_000_000
+
+
+def shard_for(id_value: str, shards: int) -> int:
+    """Stable hash partition of an id (Python's hash() is salted per process)."""
+    digest = hashlib.blake2b(id_value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def file_checksum(path: Path) -> dict:
+    """Size and SHA-256 of a file's bytes on disk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return {"bytes": size, "sha256": digest.hexdigest()}
+
+
+def write_shard(
+    shard: int,
+    rows: list[tuple[int, dict]],
+    table_name: str,
+    id_column: str,
+    columns: list[str],
+    column_types: Optional[dict],
+    snapshot: Optional[dict],
+    output_stem: Path,
+    max_bytes: int,
+    compression: Optional[str] = None,
+    insert_options: Optional[dict] = None,
+    leading_statements: Optional[list[str]] = None
+) -> dict:
+    """
+    Generate and write one shard's statements, split into files of at most
+    `max_bytes` of SQL. Multi-row INSERTs are ended early to fit; a single
+    statement that is still too big gets a file to itself, counted in 'oversized'.
+    Runs in a worker process, so encoders are rebuilt from the column types.
+    `leading_statements` (e.g. reconcile DELETEs) are written first.
+
+    Sizes and checksums describe the file as written, so they can be checked
+    with sha256sum; compressed files also record the uncompressed SQL's
+    (sql_bytes, sql_sha256).
+
+    Returns:
+        Dict with keys: files (manifest entries), skipped_rows, unchanged_rows,
+        oversized
+    """
+    kind = "INSERT" if insert_options else "UPDATE"
+
+    def render_header(part: int, part_count: int, statement_count: int) -> str:
+        return (
+            f"-- SQL {kind} statements for {table_name}\n"
+            f"-- Shard {shard}, part {part} of {part_count} ({id_column} hash partition)\n"
+            f"-- Total statements: {statement_count}\n\n"
+        )
+
+    # Size the header with the widest numbers it can hold, since the part and
+    # statement counts aren't known until the statements are packed
+    header_bytes = len(render_header(999, 999, 999_999_999).encode("utf-8"))
+
+    if insert_options:
+        insert_options = {**insert_options, "max_statement_bytes": max_bytes - header_bytes - 1}
+    encoders = build_encoders(columns, column_types) if column_types else None
+    statement_rows = []
+    statements, skipped_rows, unchanged_rows = build_statements(
+        rows, table_name, id_column, columns, encoders, snapshot, insert_options, statement_rows
+    )
+    # Leading DELETEs write no rows of their own
+    leading_statements = leading_statements or []
+    statements = leading_statements + statements
+    statement_rows = [0] * len(leading_statements) + statement_rows
+
+    # Statements are joined by a blank line and the file ends in a newline,
+    # so each one costs its length plus two bytes, less one per file
+    parts = []
+    current = []
+    current_bytes = header_bytes - 1
+    for statement, row_count in zip(statements, statement_rows):
+        size = len(statement.encode("utf-8")) + 2
+        if current and current_bytes + size > max_bytes:
+            parts.append(current)
+            current = []
+            current_bytes = header_bytes - 1
+        current.append((statement, row_count))
+        current_bytes += size
+    if current:
+        parts.append(current)
+
+    files = []
+    oversized = 0
+    for part, part_items in enumerate(parts, start=1):
+        part_statements = [statement for statement, _ in part_items]
+        path = with_compression(
+            output_stem.with_name(f"{output_stem.name}_shard{shard:03d}_{part:03d}.sql"),
+            compression
+        )
+        content = (
+            render_header(part, len(parts), len(part_statements))
+            + "\n\n".join(part_statements) + "\n"
+        )
+        data = content.encode("utf-8")
+        if len(data) > max_bytes:
+            oversized += 1
+        with open_binary(path, "wb") as f:
+            f.write(data)
+        entry = {
+            "file": path.name,
+            "shard": shard,
+            "part": part,
+            "statements": len(part_statements),
+            "rows": sum(row_count for _, row_count in part_items),
+            **file_checksum(path),
+        }
+        if compression:
+            entry["sql_bytes"] = len(data)
+            entry["sql_sha256"] = hashlib.sha256(data).hexdigest()
+        files.append(entry)
+
+    return {
+        "files": files,
+        "skipped_rows": skipped_rows,
+        "unchanged_rows": unchanged_rows,
+        "oversized": oversized,
+    }
+
+
+def write_sharded_updates(
+    rows: list[tuple[int, dict]],
+    table_name: str,
+    id_column: str,
+    columns: list[str],
+    column_types: Optional[dict],
+    snapshot: Optional[dict],
+    input_file: Path,
+    output_path: Path,
+    shards: int,
+    max_bytes: int,
+    insert_options: Optional[dict] = None,
+    reconcile: Optional[dict] = None
+) -> tuple[int, list[int], int]:
+    """
+    Hash-partition rows by id into `shards` groups, generate each group's
+    files in parallel and write a manifest next to them. Rows with the same
+    id always land in the same shard, so shards can be applied concurrently.
+    With `reconcile` (see generate_updates_from_csv, plus the 'stale' rows
+    found by find_stale_rows), each shard starts with the DELETEs for its own
+    users' stale rows.
+
+    Returns:
+        (statement_count, skipped_row_numbers, unchanged_row_count)
+    """
+    partitions = [[] for _ in range(shards)]
+    for row_num, row in rows:
+        partitions[shard_for(row.get(id_column, "").strip(), shards)].append((row_num, row))
+
+    stale_partitions = [[] for _ in range(shards)]
+    if reconcile:
+        for row in reconcile["stale"]:
+            stale_partitions[shard_for(row[reconcile["columns"][0]], shards)].append(row)
+
+    output_stem = strip_compression_suffix(output_path).with_suffix("")
+    results = [None] * shards
+
+    with ProcessPoolExecutor(max_workers=min(shards, os.cpu_count() or 1)) as executor:
+        futures = {}
+        for shard, shard_rows in enumerate(partitions):
+            shard_snapshot = None
+            if snapshot is not None:
+                shard_snapshot = {
+                    key: snapshot[key]
+                    for key in (r.get(id_column, "").strip() for _, r in shard_rows)
+                    if key in snapshot
+                }
+            futures[executor.submit(
+                write_shard, shard, shard_rows, table_name, id_column, columns,
+                column_types, shard_snapshot, output_stem, max_bytes,
+                compression_for(output_path), insert_options,
+                build_delete_statements(
+                    stale_partitions[shard], table_name, reconcile["columns"],
+                    column_types, insert_options["rows_per_statement"]
+                ) if reconcile else None
+            )] = shard
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    files = [entry for result in results for entry in result["files"]]
+    skipped_rows = sorted(n for result in results for n in result["skipped_rows"])
+    unchanged_rows = sum(result["unchanged_rows"] for result in results)
+    statement_count = sum(entry["statements"] for entry in files)
+    oversized = sum(result["oversized"] for result in results)
+
+    manifest_path = output_stem.with_name(f"{output_stem.name}_manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "table": table_name,
+            "id_column": id_column,
+            "source": input_file.name,
+            "shards": shards,
+            "max_bytes": max_bytes,
+            "total_statements": statement_count,
+            "unchanged_rows": unchanged_rows,
+            "skipped_rows": len(skipped_rows),
+            **({
+                "stale_rows_deleted": len(reconcile["stale"]),
+                "rows_already_present": reconcile["already_present"],
+            } if reconcile else {}),
+            "files": files,
+        }, f, indent=2)
+        f.write("\n")
+
+    kind = "INSERT" if insert_options else "UPDATE"
+    print(f"Generated {statement_count} {kind} statements in {len(files)} files "
+          f"across {shards} shards")
+    print(f"Manifest: {manifest_path}")
+    if oversized:
+        print(f"Warning: {oversized} file(s) exceed --max-shard-bytes ({max_bytes}) "
+              f"because a single statement in each is larger than the cap", file=sys.stderr)
+    return statement_count, skipped_rows, unchanged_rows
+
+
 def generate_updates_from_csv(
     input_path: str,
     table_name: str,
     id_column: str,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    snapshot_path: Optional[str] = None,
+    schema_path: Optional[str] = None,
+    shards: int = 0,
+    max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
+    insert_options: Optional[dict] = None,
+    reference_paths: Optional[dict] = None,
+    reject_path: Optional[str] = None,
+    reconcile: Optional[dict] = None
 ) -> None:
     """
-    Read a CSV file and generate SQL UPDATE statements for the specified table.
+    Read a CSV file and generate SQL UPDATE (or bulk INSERT) statements for
+    the specified table.
 
     Args:
         input_path: Path to the CSV file
         table_name: Fully qualified table name (e.g., public.users, public.candidates)
         id_column: CSV column name to use for matching rows (WHERE clause)
         output_path: Optional file path for output (prints to stdout if not provided)
+        snapshot_path: Optional CSV export of the table; unchanged values are not updated
+        schema_path: Optional schema source for column types (migrations directory,
+            .sql or .json); defaults to supabase/migrations when present
+        shards: If > 0, hash-partition rows by id into this many shards written
+            as size-capped files plus a manifest (requires output_path)
+        max_shard_bytes: Size cap for each shard file
+        insert_options: If given, generate multi-row INSERTs instead of UPDATEs
+            (see build_insert_statements for keys)
+        reference_paths: Optional {'users': path, 'weekends': path} exports of
+            known references; rows referencing anything else are rejected
+        reject_path: Where rejected rows go (defaults to <input>_rejects.csv)
+        reconcile: Optional {'export': path, 'columns': key columns} (insert
+            modes only). Rows in the table export that belong to a user in the
+            CSV but are no longer in it get batched DELETE statements, written
+            before the INSERTs; CSV rows the export already holds are dropped
     """
     input_file = Path(input_path)
 
@@ -140,10 +1258,38 @@ def generate_updates_from_csv(
         print(f"Error: Input file not found: {input_path}", file=sys.stderr)
         sys.exit(1)
 
-    statements = []
-    skipped_rows = []
+    if snapshot_path and not Path(snapshot_path).exists():
+        print(f"Error: Snapshot file not found: {snapshot_path}", file=sys.stderr)
+        sys.exit(1)
+
+    if insert_options and snapshot_path:
+        print("Error: --snapshot only applies to UPDATE mode", file=sys.stderr)
+        sys.exit(1)
+
+    if reconcile and not insert_options:
+        print("Error: --reconcile requires --mode insert or upsert", file=sys.stderr)
+        sys.exit(1)
 
-    with open(input_file, "r", encoding="utf-8") as f:
+    if reconcile and not Path(reconcile["export"]).exists():
+        print(f"Error: Table export not found: {reconcile['export']}", file=sys.stderr)
+        sys.exit(1)
+
+    if shards and not output_path:
+        print("Error: Sharded output requires an output file path", file=sys.stderr)
+        sys.exit(1)
+
+    for path in (reference_paths or {}).values():
+        if path and not Path(path).exists():
+            print(f"Error: Reference export not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    if reject_path:
+        reject_file = Path(reject_path)
+    else:
+        plain_input = strip_compression_suffix(input_file)
+        reject_file = plain_input.with_name(f"{plain_input.stem}_rejects.csv")
+
+    with open_text(input_file, "r") as f:
         reader = csv.DictReader(f)
 
         # Verify the ID column exists
@@ -152,46 +1298,288 @@ def generate_updates_from_csv(
             print(f"Available columns: {', '.join(reader.fieldnames)}", file=sys.stderr)
             sys.exit(1)
 
-        for row_num, row in enumerate(reader, start=2):
-            statement = generate_update_statement(row, table_name, id_column)
-            if statement:
-                statements.append(statement)
-            else:
-                skipped_rows.append(row_num)
+        columns = list(reader.fieldnames or [])
+        column_types, encoders = resolve_encoders(columns, table_name, schema_path)
+
+        snapshot = None
+        if snapshot_path:
+            snapshot = load_snapshot(Path(snapshot_path), id_column, columns)
+
+        if insert_options:
+            missing = [c for c in insert_options["conflict_columns"] if c not in columns]
+            if missing:
+                print(f"Error: Conflict column(s) not found in CSV: {', '.join(missing)}",
+                      file=sys.stderr)
+                sys.exit(1)
+
+        # CSV rows are read on a background thread while statements are built
+        pipeline = {"read": {}}
+        rows = enumerate(pipelined_reader(reader, pipeline["read"]), start=2)
+
+        if reconcile:
+            missing = [c for c in reconcile["columns"] if c not in columns]
+            if missing:
+                print(f"Error: Reconcile column(s) not found in CSV: {', '.join(missing)}",
+                      file=sys.stderr)
+                sys.exit(1)
+            # Keys are collected before validation, so rows rejected below
+            # still protect their existing copies
+            reconcile["key_sets"] = {}
+            rows = collect_reconcile_keys(rows, reconcile["columns"], reconcile["key_sets"])
+
+        rejects = []
+        validators = build_validators(columns, reference_paths or {}, table_name, id_column)
+        if validators:
+            rows = validate_rows(rows, validators, rejects)
+
+        if reconcile:
+            # The export is matched against every new key, so the rows are
+            # held until it has been read
+            rows = list(rows)
+            reconcile["stale"], present = find_stale_rows(
+                Path(reconcile["export"]), reconcile["columns"], reconcile["key_sets"]
+            )
+            rows = skip_present_rows(rows, reconcile["columns"], present, reconcile)
+
+        if shards:
+            rows = list(rows)
+            if validators:
+                write_rejects(reject_file, columns, rejects)
+                report_validation(validators, rejects, reject_file)
+            _, skipped_rows, unchanged_rows = write_sharded_updates(
+                rows, table_name, id_column, columns,
+                column_types or None, snapshot, input_file, Path(output_path),
+                shards, max_shard_bytes, insert_options, reconcile
+            )
+            report_skipped(skipped_rows, unchanged_rows)
+            report_reconcile(reconcile)
+            report_pipeline(pipeline)
+            return
+
+        statements, skipped_rows, unchanged_rows = build_statements(
+            rows, table_name, id_column, columns,
+            encoders, snapshot, insert_options
+        )
+
+    if reconcile:
+        statements = build_delete_statements(
+            reconcile["stale"], table_name, reconcile["columns"], column_types,
+            insert_options["rows_per_statement"]
+        ) + statements
+
+    if validators:
+        write_rejects(reject_file, columns, rejects)
+        report_validation(validators, rejects, reject_file)
+
+    kind = "INSERT" if insert_options else "UPDATE"
 
     # Generate output
-    output_content = f"""-- SQL UPDATE statements for {table_name}
+    output_content = f"""-- SQL {kind} statements for {table_name}
 -- Generated from: {input_file.name}
 -- ID column: {id_column}
 -- Total statements: {len(statements)}
-
+"""
+    if snapshot_path:
+        output_content += f"""-- Diffed against snapshot: {Path(snapshot_path).name}
+-- Unchanged rows skipped: {unchanged_rows}
+"""
+    if validators:
+        output_content += f"""-- Rows rejected for unknown references: {len(rejects)}
+"""
+    if reconcile:
+        output_content += f"""-- Reconciled against: {Path(reconcile['export']).name}
+-- Stale rows deleted: {len(reconcile['stale'])}
+-- Rows already in the table, not inserted: {reconcile['already_present']}
+"""
+    output_content += """
 """
     output_content += "\n\n".join(statements)
     output_content += "\n"
 
     if output_path:
         output_file = Path(output_path)
-        with open(output_file, "w", encoding="utf-8") as f:
+        with open_text(output_file, "w") as f:
             f.write(output_content)
-        print(f"Generated {len(statements)} UPDATE statements to: {output_path}")
+        print(f"Generated {len(statements)} {kind} statements to: {output_path}")
     else:
         print(output_content)
 
+    report_skipped(skipped_rows, unchanged_rows)
+    report_reconcile(reconcile)
+    report_pipeline(pipeline)
+
+
+def report_reconcile(reconcile: Optional[dict]) -> None:
+    if reconcile:
+        print(f"Deleting {len(reconcile['stale'])} stale rows found in "
+              f"{Path(reconcile['export']).name}; skipping {reconcile['already_present']} "
+              f"rows it already holds", file=sys.stderr)
+
+
+def report_skipped(skipped_rows: list[int], unchanged_rows: int) -> None:
+    """Print skipped/unchanged row counts to stderr."""
+    if unchanged_rows:
+        print(f"Skipped {unchanged_rows} rows already matching the snapshot", file=sys.stderr)
+
     if skipped_rows:
         print(f"Skipped {len(skipped_rows)} rows with no valid data: {skipped_rows[:10]}{'...' if len(skipped_rows) > 10 else ''}", file=sys.stderr)
 
 
+def report_pipeline(pipeline: dict) -> None:
+    """Print queue depth and stall time per pipeline stage to stderr."""
+    for line in format_pipeline_stats(pipeline):
+        print(f"Pipeline {line}", file=sys.stderr)
+
+
+# =============================================================================
+# ESTIMATE MODE
+# =============================================================================
+
+def estimate_updates_from_csv(
+    input_path: str,
+    table_name: str,
+    id_column: str,
+    snapshot_path: Optional[str] = None,
+    schema_path: Optional[str] = None,
+    insert_options: Optional[dict] = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = DEFAULT_SEED
+) -> None:
+    """
+    Estimate statement count, SQL size and runtime by generating SQL for a
+    seeded reservoir sample of rows, without writing any output.
+    """
+    input_file = Path(input_path)
+    if not input_file.exists():
+        print(f"Error: Input file not found: {input_path}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Sampling {sample_size} rows from {input_file} (seed {seed})...")
+
+    with open_text(input_file, "r") as f:
+        reader = csv.DictReader(f)
+        sample, total_rows, read_seconds = reservoir_sample(reader, sample_size, seed)
+        columns = list(reader.fieldnames or [])
+
+    if id_column not in columns:
+        print(f"Error: ID column '{id_column}' not found in CSV", file=sys.stderr)
+        sys.exit(1)
+
+    _, encoders = resolve_encoders(columns, table_name, schema_path)
+    snapshot = None
+    if snapshot_path and not insert_options:
+        snapshot = load_snapshot(Path(snapshot_path), id_column, columns)
+
+    emitted = []
+    sizes = []
+    seconds = []
+    statement_overhead = 0
+    for row_num, row in sample:
+        start = time.perf_counter()
+        if insert_options:
+            values = format_values_row(row, columns, encoders)
+            emitted.append(1 if values else 0)
+            sizes.append(len(values.encode("utf-8")) + 4 if values else 0)
+            if values and not statement_overhead:
+                statement, _, _ = build_insert_statements(
+                    [(row_num, row)], table_name, columns, encoders, insert_options
+                )
+                statement_overhead = len(statement[0].encode("utf-8")) - len(values)
+        else:
+            statements, _, _ = build_update_statements(
+                [(row_num, row)], table_name, id_column, encoders, snapshot
+            )
+            emitted.append(len(statements))
+            sizes.append(sum(len(s.encode("utf-8")) + 2 for s in statements))
+        seconds.append(time.perf_counter() - start)
+
+    rows_out = estimate_total(emitted, total_rows)
+    size = estimate_total(sizes, total_rows)
+    if insert_options:
+        per_statement = insert_options["rows_per_statement"]
+        statements_out = {k: math.ceil(v / per_statement) for k, v in rows_out.items()}
+        size = {k: v + statements_out[k] * statement_overhead for k, v in size.items()}
+    else:
+        statements_out = rows_out
+    runtime = scale_estimate(estimate_total(seconds, total_rows), 1, read_seconds)
+
+    kind = "INSERT" if insert_options else "UPDATE"
+    print("\n" + "=" * 50)
+    print(f"SQL {kind} ESTIMATE for {table_name}")
+    print("=" * 50)
+    print(f"{'Total rows:':<26}{total_rows:>12,}  (sampled {len(sample)})")
+    print(format_estimate("Rows emitted:", rows_out))
+    print(format_estimate("Statements:", statements_out))
+    print(format_estimate("SQL size:", size, "bytes"))
+    print(format_estimate("Expected runtime:", runtime, "seconds"))
+    if insert_options and insert_options["on_conflict"] == "update":
+        print("\nUpsert statements also split on repeated conflict keys, so there may be more.")
+
+
 def main():
     if len(sys.argv) < 4:
         print(__doc__)
         sys.exit(1)
 
-    input_csv = sys.argv[1]
-    table_name = sys.argv[2]
-    id_column = sys.argv[3]
-    output_sql = sys.argv[4] if len(sys.argv) > 4 else None
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("csv_file")
+    parser.add_argument("table_name")
+    parser.add_argument("id_column")
+    parser.add_argument("output_sql", nargs="?")
+    parser.add_argument("--snapshot")
+    parser.add_argument("--schema")
+    parser.add_argument("--shards", type=int, default=0)
+    parser.add_argument("--max-shard-bytes", type=int, default=DEFAULT_MAX_SHARD_BYTES)
+    parser.add_argument("--mode", choices=["update", "insert", "upsert"], default="update")
+    parser.add_argument("--rows-per-statement", type=int, default=DEFAULT_ROWS_PER_STATEMENT)
+    parser.add_argument("--conflict-columns", default="")
+    parser.add_argument("--valid-users")
+    parser.add_argument("--valid-weekends")
+    parser.add_argument("--reject")
+    parser.add_argument("--reconcile")
+    parser.add_argument("--reconcile-columns", default=",".join(DEFAULT_RECONCILE_COLUMNS))
+    parser.add_argument("--estimate", action="store_true")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    insert_options = None
+    if args.mode != "update":
+        insert_options = {
+            "rows_per_statement": max(1, args.rows_per_statement),
+            "on_conflict": "update" if args.mode == "upsert" else "nothing",
+            "conflict_columns": [c.strip() for c in args.conflict_columns.split(",") if c.strip()],
+        }
+        if args.mode == "upsert" and not insert_options["conflict_columns"]:
+            parser.error("--mode upsert requires --conflict-columns")
 
-    generate_updates_from_csv(input_csv, table_name, id_column, output_sql)
+    reconcile = None
+    if args.reconcile:
+        key_columns = [c.strip() for c in args.reconcile_columns.split(",") if c.strip()]
+        if args.id_column in key_columns:
+            key_columns.remove(args.id_column)
+        reconcile = {"export": args.reconcile, "columns": [args.id_column] + key_columns}
+
+    try:
+        if args.estimate:
+            estimate_updates_from_csv(
+                args.csv_file, args.table_name, args.id_column, args.snapshot,
+                args.schema, insert_options, max(1, args.sample_size), args.seed
+            )
+            return
+
+        generate_updates_from_csv(
+            args.csv_file, args.table_name, args.id_column, args.output_sql,
+            args.snapshot, args.schema, args.shards, args.max_shard_bytes,
+            insert_options,
+            {"users": args.valid_users, "weekends": args.valid_weekends},
+            args.reject, reconcile
+        )
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
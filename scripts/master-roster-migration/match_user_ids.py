@@ -3,21 +3,39 @@
 Phase 1: Match user names from old-master-roster.csv to existing user IDs.
 
 Usage:
-    python scripts/match_user_ids.py
+    python scripts/match_user_ids.py [--roster FILE] [--users FILE] [--output FILE]
+        [--unmatched FILE] [--sort-merge [--run-size N]]
 
-Input files (expected in project root):
-    - old-master-roster.csv: The legacy roster data
+Input files (expected in project root unless given):
+    - old-master-roster-mens.csv: The legacy roster data
     - existing_users.csv: Export from Supabase with columns: id, first_name, last_name
 
-Output files (written to project root):
+Output files (written to project root unless given):
     - roster_with_ids.csv: Original data plus user_id and match_status columns
     - unmatched_users.txt: List of users that couldn't be matched (for manual review)
+
+Any CSV path may end in .gz or .zst to be read or written compressed.
+
+--sort-merge matches very large inputs in bounded memory: both files are
+external-sorted by normalized name (sorted runs spill to a temp directory)
+and merge-joined in a single pass, with the same output as the default mode.
 """
 
+import argparse
 import csv
 import re
+import tempfile
 from pathlib import Path
 
+from roster_io import (
+    DEFAULT_RUN_SIZE,
+    PipelineWriter,
+    external_sort,
+    format_pipeline_stats,
+    open_text,
+    pipelined_reader,
+)
+
 
 def normalize_name(name: str) -> str:
     """Normalize a name for matching: lowercase, strip whitespace, remove special chars."""
@@ -37,7 +55,7 @@ def load_existing_users(filepath: Path) -> dict:
     """
     users_by_name = {}
 
-    with open(filepath, "r", encoding="utf-8") as f:
+    with open_text(filepath, "r") as f:
         reader = csv.DictReader(f)
         for row in reader:
             first_name = normalize_name(row.get("first_name", ""))
@@ -84,6 +102,50 @@ def match_user(first_name: str, last_name: str, existing_users: dict) -> tuple:
         return (matches[0]["id"], "multiple_matches")
 
 
+def record_match(counts: dict, unmatched_users: list, first_name: str, last_name: str, match_status: str):
+    """Tally a match result and note names needing manual review."""
+    counts[match_status] += 1
+    if match_status == "multiple_matches":
+        unmatched_users.append(f"MULTIPLE: {first_name} {last_name}")
+    elif match_status == "no_match":
+        unmatched_users.append(f"NO MATCH: {first_name} {last_name}")
+
+
+def write_results(
+    counts: dict,
+    unmatched_users: list,
+    output_path: Path,
+    unmatched_path: Path,
+    pipeline: dict = None
+):
+    """
+    Write the unmatched users report and print the matching summary,
+    including per-stage queue stats from `pipeline` when given.
+    """
+
+    # Write unmatched users report
+    with open(unmatched_path, "w", encoding="utf-8") as f:
+        f.write("Users requiring manual review:\n")
+        f.write("=" * 50 + "\n\n")
+        for user in sorted(unmatched_users):
+            f.write(f"{user}\n")
+
+    # Print summary
+    print("\n" + "=" * 50)
+    print("MATCHING SUMMARY")
+    print("=" * 50)
+    print(f"Total rows processed: {sum(counts.values())}")
+    print(f"  Matched:            {counts['matched']}")
+    print(f"  Multiple matches:   {counts['multiple_matches']}")
+    print(f"  No match:           {counts['no_match']}")
+    if pipeline:
+        print("Pipeline (queue depth and stall time per stage):")
+        for line in format_pipeline_stats(pipeline):
+            print(f"  {line}")
+    print(f"\nOutput written to: {output_path}")
+    print(f"Unmatched users written to: {unmatched_path}")
+
+
 def process_roster(roster_path: Path, existing_users_path: Path, output_path: Path, unmatched_path: Path):
     """Process the roster CSV and add user_id matching."""
 
@@ -95,64 +157,154 @@ def process_roster(roster_path: Path, existing_users_path: Path, output_path: Pa
     # Process roster
     print(f"Processing roster from {roster_path}...")
 
-    matched_count = 0
-    multiple_match_count = 0
-    no_match_count = 0
+    counts = {"matched": 0, "multiple_matches": 0, "no_match": 0}
     unmatched_users = []
+    # Rows are read and written on background threads while matching runs here
+    pipeline = {"read": {}, "output": {}}
 
-    with open(roster_path, "r", encoding="utf-8") as infile:
+    with open_text(roster_path, "r") as infile:
         reader = csv.DictReader(infile)
         fieldnames = list(reader.fieldnames or []) + ["user_id", "match_status"]
 
-        with open(output_path, "w", encoding="utf-8", newline="") as outfile:
+        with open_text(output_path, "w", newline="") as outfile:
             writer = csv.DictWriter(outfile, fieldnames=fieldnames)
             writer.writeheader()
 
-            for row in reader:
-                first_name = row.get("Name", "")
-                last_name = row.get("Last Name", "")
+            with PipelineWriter(writer.writerows, pipeline["output"]) as output:
+                for row in pipelined_reader(reader, pipeline["read"]):
+                    first_name = row.get("Name", "")
+                    last_name = row.get("Last Name", "")
 
-                user_id, match_status = match_user(first_name, last_name, existing_users)
+                    user_id, match_status = match_user(first_name, last_name, existing_users)
 
-                row["user_id"] = user_id
-                row["match_status"] = match_status
-                writer.writerow(row)
+                    row["user_id"] = user_id
+                    row["match_status"] = match_status
+                    output.write(row)
 
-                if match_status == "matched":
-                    matched_count += 1
-                elif match_status == "multiple_matches":
-                    multiple_match_count += 1
-                    unmatched_users.append(f"MULTIPLE: {first_name} {last_name}")
-                else:
-                    no_match_count += 1
-                    unmatched_users.append(f"NO MATCH: {first_name} {last_name}")
+                    record_match(counts, unmatched_users, first_name, last_name, match_status)
 
-    # Write unmatched users report
-    with open(unmatched_path, "w", encoding="utf-8") as f:
-        f.write("Users requiring manual review:\n")
-        f.write("=" * 50 + "\n\n")
-        for user in sorted(unmatched_users):
-            f.write(f"{user}\n")
+    write_results(counts, unmatched_users, output_path, unmatched_path, pipeline)
 
-    # Print summary
-    print("\n" + "=" * 50)
-    print("MATCHING SUMMARY")
-    print("=" * 50)
-    print(f"Total rows processed: {matched_count + multiple_match_count + no_match_count}")
-    print(f"  Matched:            {matched_count}")
-    print(f"  Multiple matches:   {multiple_match_count}")
-    print(f"  No match:           {no_match_count}")
-    print(f"\nOutput written to: {output_path}")
-    print(f"Unmatched users written to: {unmatched_path}")
+
+# =============================================================================
+# SORT-MERGE MATCHING
+# =============================================================================
+
+def iter_user_keys(existing_users_path: Path):
+    """Yield ((first, last), file_position, id) for every user with both names."""
+    with open_text(existing_users_path, "r") as f:
+        for position, row in enumerate(csv.DictReader(f)):
+            first_name = normalize_name(row.get("first_name", ""))
+            last_name = normalize_name(row.get("last_name", ""))
+            if first_name and last_name:
+                yield ((first_name, last_name), position, row.get("id", ""))
+
+
+def iter_roster_keys(reader):
+    """Yield ((first, last), row_number, row) for every roster row."""
+    for row_number, row in enumerate(reader):
+        key = (normalize_name(row.get("Name", "")), normalize_name(row.get("Last Name", "")))
+        yield (key, row_number, row)
+
+
+def process_roster_sort_merge(
+    roster_path: Path,
+    existing_users_path: Path,
+    output_path: Path,
+    unmatched_path: Path,
+    run_size: int = DEFAULT_RUN_SIZE
+):
+    """
+    Match the roster with bounded memory: external-sort both inputs by
+    normalized name key, merge-join them in one pass, then external-sort the
+    results back into roster order. Produces the same output as process_roster.
+    """
+    counts = {"matched": 0, "multiple_matches": 0, "no_match": 0}
+    unmatched_users = []
+
+    print(f"Sort-merge matching {roster_path} against {existing_users_path}...")
+
+    with tempfile.TemporaryDirectory(prefix="match-users-") as tmp:
+        tmp_dir = Path(tmp)
+        users_dir = tmp_dir / "users"
+        roster_dir = tmp_dir / "roster"
+        matched_dir = tmp_dir / "matched"
+        for directory in (users_dir, roster_dir, matched_dir):
+            directory.mkdir()
+
+        with open_text(roster_path, "r") as infile:
+            reader = csv.DictReader(infile)
+            fieldnames = list(reader.fieldnames or []) + ["user_id", "match_status"]
+
+            users = external_sort(iter_user_keys(existing_users_path), users_dir, run_size)
+            roster = external_sort(iter_roster_keys(reader), roster_dir, run_size)
+
+            def joined():
+                # Users with the current roster key, in export order (first wins)
+                user = next(users, None)
+                group_key = None
+                group_ids = []
+
+                for key, row_number, row in roster:
+                    if key != group_key:
+                        group_key = key
+                        group_ids = []
+                        while user is not None and user[0] < key:
+                            user = next(users, None)
+                        while user is not None and user[0] == key:
+                            group_ids.append(user[2])
+                            user = next(users, None)
+
+                    if not key[0] or not key[1] or not group_ids:
+                        user_id, match_status = "", "no_match"
+                    elif len(group_ids) == 1:
+                        user_id, match_status = group_ids[0], "matched"
+                    else:
+                        user_id, match_status = group_ids[0], "multiple_matches"
+
+                    row["user_id"] = user_id
+                    row["match_status"] = match_status
+                    record_match(counts, unmatched_users, row.get("Name", ""),
+                                 row.get("Last Name", ""), match_status)
+                    yield (row_number, row)
+
+            with open_text(output_path, "w", newline="") as outfile:
+                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+                writer.writeheader()
+                for _, row in external_sort(joined(), matched_dir, run_size):
+                    writer.writerow(row)
+
+    write_results(counts, unmatched_users, output_path, unmatched_path)
 
 
 def main():
     # Define paths
     project_root = Path(__file__).parent.parent
-    roster_path = project_root / "old-master-roster-mens.csv"
-    existing_users_path = project_root / "existing_users.csv"
-    output_path = project_root / "roster_with_ids.csv"
-    unmatched_path = project_root / "unmatched_users.txt"
+
+    parser = argparse.ArgumentParser(
+        description="Match roster names to existing user IDs (Phase 1)."
+    )
+    parser.add_argument("--roster", type=Path, default=project_root / "old-master-roster-mens.csv")
+    parser.add_argument("--users", type=Path, default=project_root / "existing_users.csv")
+    parser.add_argument("--output", type=Path, default=project_root / "roster_with_ids.csv")
+    parser.add_argument("--unmatched", type=Path, default=project_root / "unmatched_users.txt")
+    parser.add_argument(
+        "--sort-merge",
+        action="store_true",
+        help="Match with bounded memory by external-sorting both files (for very large inputs)",
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=DEFAULT_RUN_SIZE,
+        help=f"Rows per sorted run spilled to disk in --sort-merge mode (default {DEFAULT_RUN_SIZE})",
+    )
+    args = parser.parse_args()
+
+    roster_path = args.roster
+    existing_users_path = args.users
+    output_path = args.output
+    unmatched_path = args.unmatched
 
     # Check input files exist
     if not roster_path.exists():
@@ -165,7 +317,17 @@ def main():
         print(f"Save as: {existing_users_path}")
         return 1
 
-    process_roster(roster_path, existing_users_path, output_path, unmatched_path)
+    try:
+        if args.sort_merge:
+            process_roster_sort_merge(
+                roster_path, existing_users_path, output_path, unmatched_path,
+                max(1, args.run_size)
+            )
+        else:
+            process_roster(roster_path, existing_users_path, output_path, unmatched_path)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
     return 0
 
 
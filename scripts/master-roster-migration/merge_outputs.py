@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Merge converted outputs (e.g. the men's and women's runs of convert_roster.py)
+into one deduplicated load set.
+
+People who appear in more than one roster produce overlapping users_update
+rows that conflict at load time. This merges any number of users_update or
+users_experience CSVs in a single k-way pass ordered by user id:
+
+    - users_update files: one row per id; conflicting profile fields are
+      resolved with a precedence rule
+    - users_experience files: one row per (user_id, cha_role, rollo,
+      weekend_reference)
+
+Usage:
+    python scripts/merge_outputs.py <input.csv> [<input.csv> ...] --output FILE
+        [--rule first|longest] [--field-rule FIELD=RULE ...]
+        [--presorted] [--run-size N]
+
+Example:
+    python scripts/merge_outputs.py users_update_women.csv users_update_men.csv \\
+        --output users_update_all.csv --field-rule address=longest
+    python scripts/merge_outputs.py users_experience_women.csv users_experience_men.csv \\
+        --output users_experience_all.csv
+
+Precedence rules, applied per field to the rows sharing an id:
+    first   - the value from the earliest input on the command line that has
+              one (empty values never win)
+    longest - the longest value, ties going to the earlier input (e.g. the
+              most complete address)
+
+Inputs are sorted by user id on disk in runs of --run-size rows before the
+merge, so memory stays bounded however large they are. Pass --presorted when
+every input is already sorted by id to skip that step. Any path may end in
+.gz or .zst.
+"""
+
+import argparse
+import csv
+import heapq
+import tempfile
+from itertools import groupby
+from pathlib import Path
+
+from roster_io import DEFAULT_RUN_SIZE, external_sort, open_text
+
+
+# Id column for each kind of converted output
+ID_COLUMNS = {
+    "users_update": "id",
+    "users_experience": "user_id",
+}
+
+PRECEDENCE_RULES = ("first", "longest")
+
+
+def detect_kind(fieldnames: list[str]) -> str:
+    """Tell users_update and users_experience files apart by their header."""
+    if "id" in fieldnames:
+        return "users_update"
+    if "user_id" in fieldnames:
+        return "users_experience"
+    raise RuntimeError(f"Not a converted output (no id or user_id column): {', '.join(fieldnames)}")
+
+
+def read_header(path: Path) -> list[str]:
+    with open_text(path, "r", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def iter_keyed_rows(path: Path, id_column: str, stats: dict):
+    """Yield (id, row_number, values) for every row with an id."""
+    with open_text(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = header.index(id_column)
+        for row_number, values in enumerate(reader):
+            stats["rows_read"] += 1
+            if index >= len(values) or not values[index].strip():
+                stats["rows_without_id"] += 1
+                continue
+            yield (values[index].strip(), row_number, tuple(values))
+
+
+def iter_sorted_input(path: Path, rank: int, id_column: str, stats: dict, tmp_dir: Path,
+                      run_size: int, presorted: bool):
+    """
+    Yield (id, rank, row_number, values) in id order for one input. `rank`
+    is the input's position on the command line, so heapq.merge breaks ties
+    between inputs by precedence.
+    """
+    rows = iter_keyed_rows(path, id_column, stats)
+    if not presorted:
+        run_dir = tmp_dir / f"input-{rank:03d}"
+        run_dir.mkdir()
+        rows = external_sort(rows, run_dir, run_size)
+
+    previous = None
+    for user_id, row_number, values in rows:
+        if presorted and previous is not None and user_id < previous:
+            raise RuntimeError(f"{path} is not sorted by {id_column} (row {row_number + 2}); "
+                               f"drop --presorted")
+        previous = user_id
+        yield (user_id, rank, row_number, values)
+
+
+def resolve_field(values: list[str], rule: str) -> str:
+    """Pick one value from candidates listed in precedence order."""
+    candidates = [v for v in values if v.strip()]
+    if not candidates:
+        return ""
+    if rule == "longest":
+        return max(candidates, key=lambda v: len(v.strip()))
+    return candidates[0]
+
+
+def merge_users(group: list[tuple], fieldnames: list[str], id_index: int, rules: dict,
+                stats: dict) -> list[str]:
+    """Collapse the rows for one id into a single row, field by field."""
+    merged = []
+    for i, column in enumerate(fieldnames):
+        candidates = [row[i] if i < len(row) else "" for _, _, _, row in group]
+        if i == id_index:
+            merged.append(candidates[0].strip())
+            continue
+        if len({v.strip() for v in candidates if v.strip()}) > 1:
+            stats["field_conflicts"] += 1
+        merged.append(resolve_field(candidates, rules.get(column, rules["*"])))
+    return merged
+
+
+def merge_outputs(
+    input_paths: list[Path],
+    output_path: Path,
+    rules: dict,
+    run_size: int = DEFAULT_RUN_SIZE,
+    presorted: bool = False
+) -> dict:
+    """
+    K-way merge converted outputs by id into one deduplicated file.
+
+    Args:
+        rules: Field -> precedence rule, with '*' as the default for all fields
+
+    Returns:
+        Dict of merge statistics
+    """
+    headers = [read_header(path) for path in input_paths]
+    fieldnames = headers[0]
+    for path, header in zip(input_paths, headers):
+        if header != fieldnames:
+            raise RuntimeError(f"{path} has different columns from {input_paths[0]}")
+
+    kind = detect_kind(fieldnames)
+    id_column = ID_COLUMNS[kind]
+    id_index = fieldnames.index(id_column)
+    unknown = [field for field in rules if field != "*" and field not in fieldnames]
+    if unknown:
+        raise RuntimeError(f"--field-rule column(s) not in the inputs: {', '.join(unknown)}")
+
+    stats = {
+        "kind": kind,
+        "rows_read": 0,
+        "rows_without_id": 0,
+        "ids": 0,
+        "ids_in_several_inputs": 0,
+        "rows_written": 0,
+        "duplicates_removed": 0,
+        "field_conflicts": 0,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="merge-outputs-") as tmp:
+        streams = [
+            iter_sorted_input(path, rank, id_column, stats, Path(tmp), run_size, presorted)
+            for rank, path in enumerate(input_paths)
+        ]
+
+        with open_text(output_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+
+            for _, rows in groupby(heapq.merge(*streams), key=lambda item: item[0]):
+                group = list(rows)
+                stats["ids"] += 1
+                if len({rank for _, rank, _, _ in group}) > 1:
+                    stats["ids_in_several_inputs"] += 1
+
+                if kind == "users_update":
+                    writer.writerow(merge_users(group, fieldnames, id_index, rules, stats))
+                    stats["rows_written"] += 1
+                    stats["duplicates_removed"] += len(group) - 1
+                    continue
+
+                # Experience: keep the first copy of each record for this user
+                seen = set()
+                for _, _, _, values in group:
+                    key = tuple(v.strip() for v in values)
+                    if key in seen:
+                        stats["duplicates_removed"] += 1
+                        continue
+                    seen.add(key)
+                    writer.writerow(values)
+                    stats["rows_written"] += 1
+
+    return stats
+
+
+def parse_field_rules(default_rule: str, field_rules: list[str]) -> dict:
+    rules = {"*": default_rule}
+    for item in field_rules:
+        field, _, rule = item.partition("=")
+        if not field or rule not in PRECEDENCE_RULES:
+            raise ValueError(
+                f"Invalid --field-rule {item!r} (expected FIELD={'|'.join(PRECEDENCE_RULES)})"
+            )
+        rules[field.strip()] = rule
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge converted roster outputs into one deduplicated load set.",
+        epilog="Example: python scripts/merge_outputs.py users_update_women.csv "
+               "users_update_men.csv --output users_update_all.csv",
+    )
+    parser.add_argument("inputs", nargs="+", type=Path,
+                        help="users_update or users_experience CSVs, highest precedence first")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--rule", choices=PRECEDENCE_RULES, default="first",
+                        help="How conflicting profile fields are resolved (default: first)")
+    parser.add_argument("--field-rule", action="append", default=[], metavar="FIELD=RULE",
+                        help="Override --rule for one field, e.g. address=longest")
+    parser.add_argument("--presorted", action="store_true",
+                        help="Inputs are already sorted by id; skip the on-disk sort")
+    parser.add_argument("--run-size", type=int, default=DEFAULT_RUN_SIZE,
+                        help=f"Rows per sorted run spilled to disk (default {DEFAULT_RUN_SIZE})")
+    args = parser.parse_args()
+
+    try:
+        rules = parse_field_rules(args.rule, args.field_rule)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for path in args.inputs:
+        if not path.exists():
+            print(f"ERROR: File not found: {path}")
+            return 1
+    if args.output in args.inputs:
+        print(f"ERROR: Output would overwrite an input: {args.output}")
+        return 1
+
+    try:
+        stats = merge_outputs(args.inputs, args.output, rules, max(1, args.run_size), args.presorted)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    print("\n" + "=" * 50)
+    print("MERGE SUMMARY")
+    print("=" * 50)
+    print(f"Inputs ({stats['kind']}):  {len(args.inputs)}")
+    print(f"Rows read:            {stats['rows_read']}")
+    print(f"Rows without id:      {stats['rows_without_id']}")
+    print(f"Distinct ids:         {stats['ids']}")
+    print(f"Ids in several files: {stats['ids_in_several_inputs']}")
+    print(f"Duplicates removed:   {stats['duplicates_removed']}")
+    if stats["kind"] == "users_update":
+        print(f"Field conflicts:      {stats['field_conflicts']}")
+    print(f"Rows written:         {stats['rows_written']}")
+    print(f"\nOutput written to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Sampling helpers for the --estimate dry runs of convert_roster.py and
+csv_to_sql_updates.py.
+
+A seeded reservoir sample of rows is drawn in one pass over the input, the
+real conversion runs on just those rows, and per-row measurements are
+extrapolated to the whole file with a normal-approximation confidence
+interval (with finite population correction, so a sample covering the whole
+file has zero width).
+"""
+
+import math
+import random
+import time
+
+
+# Rows sampled by default, and the seed that makes reruns reproducible
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_SEED = 0
+
+# z-score for the reported confidence intervals
+CONFIDENCE_Z = 1.96
+CONFIDENCE_LABEL = "95% CI"
+
+
+def reservoir_sample(rows, sample_size: int, seed: int = DEFAULT_SEED) -> tuple[list, int, float]:
+    """
+    Draw a uniform sample of up to `sample_size` rows in a single pass.
+
+    Returns:
+        (sample, total_rows, read_seconds) where sample is a list of
+        (row_index, row) in input order
+    """
+    rng = random.Random(seed)
+    sample = []
+    total = 0
+    start = time.perf_counter()
+
+    for i, row in enumerate(rows):
+        total = i + 1
+        if i < sample_size:
+            sample.append((i, row))
+        else:
+            j = rng.randrange(i + 1)
+            if j < sample_size:
+                sample[j] = (i, row)
+
+    sample.sort(key=lambda item: item[0])
+    return sample, total, time.perf_counter() - start
+
+
+def estimate_total(values: list[float], population: int) -> dict:
+    """
+    Extrapolate per-row sample values to a population total.
+
+    Returns:
+        Dict with keys: estimate, low, high (confidence bounds), mean (per row)
+    """
+    n = len(values)
+    if n == 0 or population == 0:
+        return {"estimate": 0.0, "low": 0.0, "high": 0.0, "mean": 0.0}
+
+    mean = sum(values) / n
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    fpc = math.sqrt((population - n) / (population - 1)) if population > 1 else 0.0
+    half_width = CONFIDENCE_Z * population * math.sqrt(variance / n) * fpc
+
+    estimate = mean * population
+    return {
+        "estimate": estimate,
+        "low": max(0.0, estimate - half_width),
+        "high": estimate + half_width,
+        "mean": mean,
+    }
+
+
+def scale_estimate(est: dict, factor: float, offset: float = 0.0) -> dict:
+    """Apply a linear transform (e.g. rows -> statements) to an estimate."""
+    return {key: value * factor + offset for key, value in est.items()}
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def format_estimate(label: str, est: dict, kind: str = "count") -> str:
+    """One aligned report line: estimate and its confidence interval."""
+    if kind == "bytes":
+        fmt = format_bytes
+    elif kind == "seconds":
+        fmt = lambda v: f"{v:,.1f}s"
+    elif kind == "percent":
+        fmt = lambda v: f"{v:.1%}"
+    else:
+        fmt = lambda v: f"{v:,.0f}"
+    return f"{label:<26}{fmt(est['estimate']):>12}  ({CONFIDENCE_LABEL} {fmt(est['low'])} - {fmt(est['high'])})"
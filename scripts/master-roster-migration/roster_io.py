@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Shared file helpers for the master roster migration scripts.
+
+Files ending in .gz or .zst are compressed/decompressed transparently, so any
+input or output path can be given with one of those extensions:
+
+    python scripts/convert_roster.py roster_with_ids-women.csv.gz --compress zst
+    python scripts/csv_to_sql_updates.py users_update_women.csv.zst public.users id output.sql.gz
+
+The (de)compression runs on a background thread that exchanges chunks with
+the caller through a small bounded queue, so it overlaps with CSV parsing
+and formatting instead of adding to it.
+
+zstd support needs the optional `zstandard` package (pip install zstandard);
+gzip uses the standard library.
+
+The pipeline helpers at the bottom apply the same idea to rows: a reader
+thread fills a bounded queue of row batches while the caller converts, and
+each output gets a writer thread draining its own queue. Every stage
+records its peak queue depth and how long each side spent stalled.
+
+external_sort sorts more records than fit in memory by spilling sorted runs
+to a temporary directory and merging them back.
+"""
+
+import gzip
+import heapq
+import io
+import pickle
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+# Extension -> compression format
+COMPRESSION_SUFFIXES = {
+    ".gz": "gz",
+    ".zst": "zst",
+}
+
+# Bytes handed between the caller and the background thread at a time, and
+# how many such chunks may be in flight
+CHUNK_SIZE = 256 * 1024
+QUEUE_DEPTH = 8
+
+
+def compression_for(path) -> Optional[str]:
+    """Return 'gz' or 'zst' if the path has a compressed extension, else None."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def strip_compression_suffix(path) -> Path:
+    """'users_update.csv.gz' -> 'users_update.csv'; other paths are unchanged."""
+    path = Path(path)
+    return path.with_suffix("") if compression_for(path) else path
+
+
+def with_compression(path, compression: Optional[str]) -> Path:
+    """Append the extension for `compression` ('gz', 'zst' or None) to a path."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.{compression}") if compression else path
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "Reading or writing .zst files requires the 'zstandard' package "
+            "(pip install zstandard)"
+        ) from None
+    return zstandard
+
+
+class _BackgroundWriter(io.RawIOBase):
+    """Raw stream whose writes are compressed and written by a worker thread."""
+
+    def __init__(self, path, compression: str):
+        super().__init__()
+        zstandard = _zstandard() if compression == "zst" else None
+        self._file = open(path, "wb")
+        if zstandard is None:
+            self._sink = gzip.GzipFile(fileobj=self._file, mode="wb")
+        else:
+            self._sink = zstandard.ZstdCompressor().stream_writer(self._file, closefd=False)
+
+        self._queue = queue.Queue(maxsize=QUEUE_DEPTH)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                continue  # Keep draining so the writer never blocks
+            try:
+                self._sink.write(chunk)
+            except Exception as e:
+                self._error = e
+
+        try:
+            self._sink.close()
+        except Exception as e:
+            self._error = self._error or e
+        finally:
+            self._file.close()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._error is not None:
+            raise self._error
+        chunk = bytes(data)
+        self._queue.put(chunk)
+        return len(chunk)
+
+    def close(self):
+        if not self.closed:
+            self._queue.put(None)
+            self._thread.join()
+            super().close()
+            if self._error is not None:
+                raise self._error
+
+
+class _BackgroundReader(io.RawIOBase):
+    """Raw stream fed with decompressed chunks by a worker thread."""
+
+    def __init__(self, path, compression: str):
+        super().__init__()
+        zstandard = _zstandard() if compression == "zst" else None
+        self._file = open(path, "rb")
+        if zstandard is None:
+            self._source = gzip.GzipFile(fileobj=self._file, mode="rb")
+        else:
+            self._source = zstandard.ZstdDecompressor().stream_reader(self._file, closefd=False)
+
+        self._queue = queue.Queue(maxsize=QUEUE_DEPTH)
+        self._stop = threading.Event()
+        self._pending = b""
+        self._eof = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            while True:
+                chunk = self._source.read(CHUNK_SIZE)
+                if not chunk:
+                    self._put(None)
+                    break
+                if not self._put(chunk):
+                    break
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._source.close()
+            self._file.close()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+                return 0
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._pending = item
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            super().close()
+
+
+def open_binary(path, mode: str = "rb"):
+    """Open a file for binary reading ('rb') or writing ('wb'), compressed by extension."""
+    compression = compression_for(path)
+    if not compression:
+        return open(path, mode)
+
+    if mode == "rb":
+        return io.BufferedReader(_BackgroundReader(path, compression), CHUNK_SIZE)
+    if mode == "wb":
+        return io.BufferedWriter(_BackgroundWriter(path, compression), CHUNK_SIZE)
+    raise ValueError(f"Unsupported mode for compressed file: {mode!r}")
+
+
+def open_text(path, mode: str = "r", encoding: str = "utf-8", newline: Optional[str] = None):
+    """
+    Drop-in replacement for open() in text mode ('r' or 'w') that handles
+    .gz and .zst files transparently.
+    """
+    if not compression_for(path):
+        return open(path, mode, encoding=encoding, newline=newline)
+
+    return io.TextIOWrapper(open_binary(path, mode + "b"), encoding=encoding, newline=newline)
+
+
+# =============================================================================
+# PIPELINED ROWS
+# =============================================================================
+
+# Rows handed between threads at a time, and how many batches may be queued
+PIPELINE_BATCH_SIZE = 500
+PIPELINE_QUEUE_DEPTH = 16
+
+
+def _new_stage_stats() -> dict:
+    # producer_stall: time the producer was blocked on a full queue;
+    # consumer_stall: time the consumer waited on an empty one
+    return {"batches": 0, "max_depth": 0, "producer_stall": 0.0, "consumer_stall": 0.0}
+
+
+def pipelined_reader(rows, stats: dict, batch_size: int = PIPELINE_BATCH_SIZE):
+    """
+    Iterate `rows` (e.g. a csv.DictReader) on a background thread, handing
+    them over in batches through a bounded queue. `stats` is filled in with
+    the stage's batch count, peak queue depth and stall times.
+    """
+    stats.update(_new_stage_stats())
+    batches = queue.Queue(maxsize=PIPELINE_QUEUE_DEPTH)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                stats["producer_stall"] += time.perf_counter() - start
+                if isinstance(item, list):
+                    stats["max_depth"] = max(stats["max_depth"], batches.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch and not put(batch):
+                return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            batch = batches.get()
+            stats["consumer_stall"] += time.perf_counter() - start
+            if batch is None:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            stats["batches"] += 1
+            yield from batch
+    finally:
+        stop.set()
+        thread.join()
+
+
+class PipelineWriter:
+    """
+    Collect rows into batches and pass them to `write_batch(rows)` on a
+    dedicated writer thread. Use as a context manager; errors raised by
+    the writer resurface on the next write() or on close().
+    """
+
+    def __init__(self, write_batch, stats: dict, batch_size: int = PIPELINE_BATCH_SIZE):
+        self.stats = stats
+        stats.update(_new_stage_stats())
+        self._write_batch = write_batch
+        self._batch_size = batch_size
+        self._batch = []
+        self._queue = queue.Queue(maxsize=PIPELINE_QUEUE_DEPTH)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            start = time.perf_counter()
+            batch = self._queue.get()
+            self.stats["consumer_stall"] += time.perf_counter() - start
+            if batch is None:
+                break
+            if self._error is not None:
+                continue  # Keep draining so the producer never blocks
+            try:
+                self._write_batch(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                self._error = e
+
+    def _put(self, item):
+        start = time.perf_counter()
+        self._queue.put(item)
+        self.stats["producer_stall"] += time.perf_counter() - start
+        if item is not None:
+            self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+
+    def write(self, row):
+        if self._error is not None:
+            raise self._error
+        self._batch.append(row)
+        if len(self._batch) >= self._batch_size:
+            self._put(self._batch)
+            self._batch = []
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def close(self):
+        if self._thread.is_alive():
+            if self._batch:
+                self._put(self._batch)
+                self._batch = []
+            self._put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._put(None)
+            self._thread.join()
+        return False
+
+
+def format_pipeline_stats(pipeline: dict) -> list[str]:
+    """One line per stage: batches, peak queue depth and stall times."""
+    return [
+        f"{name:<12} {stage['batches']:>6} batches, peak queue {stage['max_depth']:>2}/"
+        f"{PIPELINE_QUEUE_DEPTH}, producer stalled {stage['producer_stall']:.3f}s, "
+        f"consumer stalled {stage['consumer_stall']:.3f}s"
+        for name, stage in pipeline.items()
+        if stage
+    ]
+
+
+# =============================================================================
+# EXTERNAL SORT
+# =============================================================================
+
+# Records held in memory per sorted run before spilling to disk
+DEFAULT_RUN_SIZE = 50_000
+
+
+def _write_run(records: list, tmp_dir: Path, run_number: int) -> Path:
+    """Write one sorted run as a stream of pickled records."""
+    path = tmp_dir / f"run-{run_number:05d}.pickle"
+    with open(path, "wb") as f:
+        for record in records:
+            pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: Path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def external_sort(records, tmp_dir: Path, run_size: int = DEFAULT_RUN_SIZE):
+    """
+    Sort tuples of any length by their natural order using bounded memory:
+    sorted runs of `run_size` records are spilled to `tmp_dir` and k-way merged.
+    """
+    runs = []
+    buffer = []
+
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= run_size:
+            buffer.sort()
+            runs.append(_write_run(buffer, tmp_dir, len(runs)))
+            buffer = []
+
+    buffer.sort()
+    if not runs:
+        yield from buffer
+        return
+    if buffer:
+        runs.append(_write_run(buffer, tmp_dir, len(runs)))
+
+    yield from heapq.merge(*(_read_run(path) for path in runs))
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Warm local service for matching names (Phase 1) and converting roster rows (Phase 2).
+
+Starting match_user_ids.py or convert_roster.py for every lookup pays for
+interpreter startup, loading existing_users.csv and compiling the mapping
+tables. The server does that once and keeps the user index and role
+mappings in memory, then answers match and convert requests for single
+rows or batches over localhost HTTP or a Unix socket.
+
+Usage:
+    python scripts/roster_service.py serve [--users existing_users.csv]
+        [--mappings role_mappings.json] [--port 8765 | --socket PATH]
+
+    python scripts/roster_service.py match FIRST LAST
+    python scripts/roster_service.py match --csv old-master-roster-womens.csv
+    python scripts/roster_service.py convert --row '{"user_id": "...", "Position @ DTTD": "..."}'
+    python scripts/roster_service.py convert --csv roster_with_ids-women.csv
+    python scripts/roster_service.py reload
+
+Every client command accepts the same --port/--socket as the server and
+prints the JSON response. `reload` re-reads the users export and mappings
+file after they change.
+
+Endpoints (JSON over HTTP):
+    POST /match    {"names": [{"first_name": ..., "last_name": ...}, ...]}
+                   -> {"results": [{"user_id": ..., "match_status": ...}, ...]}
+    POST /convert  {"rows": [{roster CSV columns}, ...]}
+                   -> {"results": [{"user": {...} | null, "experience": [...],
+                       "unmatched": [...], "unparsed_weekends": [...]}, ...],
+                       "duplicates_removed": N}
+    POST /reload   {} -> {"users": N, "mappings": "role_mappings.json"}
+    GET  /health   -> {"status": "ok", "users": N}
+
+The server only listens on 127.0.0.1 (or a Unix socket).
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import re
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import convert_roster
+from match_user_ids import load_existing_users, match_user
+from roster_io import open_text
+
+
+DEFAULT_PORT = 8765
+
+# Rows sent per request by the client's --csv mode
+CLIENT_BATCH_SIZE = 1000
+
+
+# =============================================================================
+# SERVICE STATE
+# =============================================================================
+
+def load_state(users_path: Path, mappings_path: Path) -> dict:
+    """Load the user index and compile the mapping tables."""
+    existing_users = load_existing_users(users_path) if users_path.exists() else {}
+    convert_roster.use_mappings(convert_roster.load_mappings(mappings_path))
+    return {
+        "users_path": users_path,
+        "mappings_path": mappings_path,
+        "existing_users": existing_users,
+        "user_count": sum(len(v) for v in existing_users.values()),
+    }
+
+
+def handle_match(state: dict, request: dict) -> dict:
+    existing_users = state["existing_users"]
+    results = []
+    for name in request.get("names", []):
+        user_id, match_status = match_user(
+            name.get("first_name", ""), name.get("last_name", ""), existing_users
+        )
+        results.append({"user_id": user_id, "match_status": match_status})
+    return {"results": results}
+
+
+def handle_convert(state: dict, request: dict) -> dict:
+    """
+    Convert roster rows exactly as convert_roster.py would. Experience
+    records are deduped across the whole request.
+    """
+    results = []
+    seen = set()
+    duplicates = 0
+
+    for row in request.get("rows", []):
+        if not str(row.get("user_id", "")).strip():
+            results.append({"user": None, "experience": [], "unmatched": [],
+                            "unparsed_weekends": [], "skipped": "no user_id"})
+            continue
+
+        unparsed_weekends = []
+        result = convert_roster.map_row(convert_roster.parse_row(row, unparsed_weekends))
+
+        experience = []
+        for rec, _ in convert_roster.iter_experience([result]):
+            key = convert_roster.experience_key(rec)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            experience.append(rec)
+
+        results.append({
+            "user": result["user"],
+            "experience": experience,
+            "unmatched": [
+                {"role": role, "is_other": is_other} for role, is_other in result["unmatched"]
+            ],
+            "unparsed_weekends": unparsed_weekends,
+        })
+
+    return {"results": results, "duplicates_removed": duplicates}
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "RosterService/1"
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "users": self.server.state["user_count"]})
+        else:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send(400, {"error": f"Invalid JSON request: {e}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            if self.path == "/match":
+                response = handle_match(self.server.state, request)
+            elif self.path == "/convert":
+                with self.server.lock:
+                    response = handle_convert(self.server.state, request)
+            elif self.path == "/reload":
+                with self.server.lock:
+                    state = self.server.state
+                    self.server.state = load_state(state["users_path"], state["mappings_path"])
+                response = {
+                    "users": self.server.state["user_count"],
+                    "mappings": str(self.server.state["mappings_path"]),
+                }
+            else:
+                self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+                return
+        except (OSError, ValueError, AttributeError, re.error) as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._send(200, response)
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def serve(state: dict, port: int, socket_path: Path = None, verbose: bool = False):
+    """Serve requests until interrupted."""
+    if socket_path:
+        if socket_path.exists():
+            socket_path.unlink()
+        server = _UnixHTTPServer(str(socket_path), _RequestHandler)
+        where = f"unix socket {socket_path}"
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _RequestHandler)
+        where = f"http://127.0.0.1:{server.server_port}"
+
+    server.state = state
+    server.lock = threading.Lock()
+    server.verbose = verbose
+
+    print(f"Loaded {state['user_count']} users and mappings from {state['mappings_path']}")
+    print(f"Listening on {where} (Ctrl+C to stop)...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        server.server_close()
+        if socket_path and socket_path.exists():
+            socket_path.unlink()
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def call(args, method: str, path: str, body: dict = None) -> dict:
+    """Send one request to the server and return the decoded JSON response."""
+    if args.socket:
+        conn = _UnixHTTPConnection(str(args.socket))
+    else:
+        conn = http.client.HTTPConnection("127.0.0.1", args.port)
+
+    try:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        result = json.loads(response.read() or b"{}")
+    except (OSError, http.client.HTTPException) as e:
+        raise RuntimeError(f"Could not reach the roster service: {e}") from None
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        raise RuntimeError(result.get("error", f"HTTP {response.status}"))
+    return result
+
+
+def iter_csv_batches(path: Path, batch_size: int = CLIENT_BATCH_SIZE):
+    with open_text(path, "r", newline="") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def run_client(args) -> None:
+    if args.command == "reload":
+        print(json.dumps(call(args, "POST", "/reload", {})))
+        return
+
+    if args.command == "match":
+        if args.csv:
+            for batch in iter_csv_batches(args.csv):
+                names = [
+                    {"first_name": row.get("Name", ""), "last_name": row.get("Last Name", "")}
+                    for row in batch
+                ]
+                for result in call(args, "POST", "/match", {"names": names})["results"]:
+                    print(json.dumps(result))
+            return
+        if not (args.first_name and args.last_name):
+            raise RuntimeError("match needs FIRST LAST or --csv FILE")
+        names = [{"first_name": args.first_name, "last_name": args.last_name}]
+        print(json.dumps(call(args, "POST", "/match", {"names": names})))
+        return
+
+    # convert
+    if args.csv:
+        for batch in iter_csv_batches(args.csv):
+            for result in call(args, "POST", "/convert", {"rows": batch})["results"]:
+                print(json.dumps(result))
+        return
+    if not args.row:
+        raise RuntimeError("convert needs --row JSON or --csv FILE")
+    try:
+        row = json.loads(args.row)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"--row is not valid JSON: {e}") from None
+    print(json.dumps(call(args, "POST", "/convert", {"rows": [row]})))
+
+
+def main():
+    project_root = Path(__file__).parent.parent
+
+    connection = argparse.ArgumentParser(add_help=False)
+    connection.add_argument("--port", type=int, default=DEFAULT_PORT,
+                            help=f"Localhost port (default {DEFAULT_PORT})")
+    connection.add_argument("--socket", type=Path,
+                            help="Use a Unix socket at this path instead of a port")
+
+    parser = argparse.ArgumentParser(
+        description="Warm local service for roster matching and conversion."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", parents=[connection], help="Run the server")
+    serve_parser.add_argument("--users", type=Path, default=project_root / "existing_users.csv")
+    serve_parser.add_argument("--mappings", type=Path,
+                              default=convert_roster.DEFAULT_MAPPINGS_PATH)
+    serve_parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    match_parser = commands.add_parser("match", parents=[connection],
+                                       help="Match one name, or every row of a roster CSV")
+    match_parser.add_argument("first_name", nargs="?")
+    match_parser.add_argument("last_name", nargs="?")
+    match_parser.add_argument("--csv", type=Path, help="Roster CSV with Name and Last Name")
+
+    convert_parser = commands.add_parser("convert", parents=[connection],
+                                         help="Convert one row, or every row of a roster CSV")
+    convert_parser.add_argument("--row", help="Roster row as a JSON object of CSV columns")
+    convert_parser.add_argument("--csv", type=Path, help="Roster CSV with a user_id column")
+
+    commands.add_parser("reload", parents=[connection],
+                        help="Re-read the users export and mappings file")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            if not args.users.exists():
+                print(f"WARNING: {args.users} not found, matching will find no users",
+                      file=sys.stderr)
+            serve(load_state(args.users, args.mappings), args.port, args.socket, args.verbose)
+        else:
+            run_client(args)
+    except (OSError, ValueError, re.error, RuntimeError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
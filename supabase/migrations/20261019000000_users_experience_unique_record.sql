@@ -0,0 +1,21 @@
+-- Unique identity for users_experience records.
+-- The master roster import (scripts/master-roster-migration) inserts records with
+-- ON CONFLICT, which needs a unique index to conflict on. Without one, every rerun
+-- of the import inserted the same experience again.
+--
+-- rollo is NULL for every non-Rollista role, so the index is NULLS NOT DISTINCT
+-- (Postgres 15+); otherwise two identical records with no rollo would never conflict.
+
+-- 1. Remove existing duplicates, keeping the earliest copy of each record.
+DELETE FROM "public"."users_experience" ue
+USING "public"."users_experience" keep
+WHERE ue."user_id" = keep."user_id"
+  AND ue."cha_role" = keep."cha_role"
+  AND ue."rollo" IS NOT DISTINCT FROM keep."rollo"
+  AND ue."weekend_reference" = keep."weekend_reference"
+  AND (keep."created_at", keep."id") < (ue."created_at", ue."id");
+
+-- 2. One row per (user_id, cha_role, rollo, weekend_reference).
+CREATE UNIQUE INDEX "users_experience_record_key"
+  ON "public"."users_experience" ("user_id", "cha_role", "rollo", "weekend_reference")
+  NULLS NOT DISTINCT;